@@ -1,2 +1,3 @@
 pip install -r backend/requirements/dev.txt
-python backend/manage.py migrate
\ No newline at end of file
+python backend/manage.py migrate
+python backend/manage.py createcachetable
\ No newline at end of file
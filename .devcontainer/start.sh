@@ -1 +1,4 @@
+python backend/manage.py send_outbox > /tmp/send_outbox.log 2>&1 &
+python backend/manage.py run_exports > /tmp/run_exports.log 2>&1 &
+python backend/manage.py build_avatar_variants > /tmp/build_avatar_variants.log 2>&1 &
 python backend/manage.py runserver
\ No newline at end of file
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import base64
+import pickle
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.db import DatabaseCache as BaseDatabaseCache
+from django.db import DatabaseError, connections, router, transaction
+from django.utils.timezone import now as tz_now
+
+if TYPE_CHECKING:
+    from typing import Any, Optional
+
+
+class DatabaseCache(BaseDatabaseCache):
+    def set_many(
+        self,
+        data: dict[str, Any],
+        timeout: Optional[float] = DEFAULT_TIMEOUT,  # type: ignore
+        version: Optional[int] = None,
+    ):
+        # The stock backend sets key by key at up to four queries each. Version
+        # bumps write many keys at once, so replace them in a single statement.
+        if len(data) < 2:
+            return super().set_many(data, timeout, version)
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            expires = datetime.max
+        else:
+            expires = datetime.fromtimestamp(
+                timeout, tz=timezone.utc if settings.USE_TZ else None
+            )
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        table = quote_name(self._table)
+        expires = connection.ops.adapt_datetimefield_value(
+            expires.replace(microsecond=0)
+        )
+        rows = {
+            self.make_and_validate_key(key, version=version): base64.b64encode(
+                pickle.dumps(value, self.pickle_protocol)
+            ).decode("latin1")
+            for key, value in data.items()
+        }
+        placeholders = ", ".join(["%s"] * len(rows))
+        try:
+            with transaction.atomic(using=db), connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM %s" % table)
+                num = cursor.fetchone()[0]
+                if num > self._max_entries:
+                    self._cull(db, cursor, tz_now().replace(microsecond=0), num)
+                cursor.execute(
+                    "DELETE FROM %s WHERE %s IN (%s)"
+                    % (table, quote_name("cache_key"), placeholders),
+                    list(rows),
+                )
+                cursor.execute(
+                    "INSERT INTO %s (%s, %s, %s) VALUES %s"
+                    % (
+                        table,
+                        quote_name("cache_key"),
+                        quote_name("value"),
+                        quote_name("expires"),
+                        ", ".join(["(%s, %s, %s)"] * len(rows)),
+                    ),
+                    [
+                        param
+                        for key, value in rows.items()
+                        for param in (key, value, expires)
+                    ],
+                )
+        except DatabaseError:
+            return list(data)
+        return []
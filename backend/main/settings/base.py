@@ -89,10 +89,17 @@ EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 # AUTHENTICATION
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#authentication-backends
+# Sessions store the path of the backend that signed them in and end when it
+# is no longer listed. The stock model and allauth backends stay listed after
+# the profile ones, which authenticate first, so sessions from before the
+# switch stay signed in. They can go once SESSION_COOKIE_AGE has passed.
 AUTHENTICATION_BACKENDS = [
+    "users.backends.ProfileModelBackend",
+    "users.backends.ProfileAuthenticationBackend",
     "django.contrib.auth.backends.ModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
     "guardian.backends.ObjectPermissionBackend",
+    "scheduler.backends.SessionPermissionBackend",
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#login-redirect-url
 LOGIN_REDIRECT_URL = "users:redirect"
@@ -282,7 +289,24 @@ ANONYMOUS_USER_NAME = None
 
 # Custom settings
 # ------------------------------------------------------------------------------
-DEFAULT_PROFILE = "https://upload.wikimedia.org/wikipedia/commons/a/ac/Default_pfp.jpg"
+# Static file shown for profiles without an avatar of their own.
+DEFAULT_PROFILE = "images/default-avatar.png"
+# Square sizes in pixels of the WebP and PNG copies made of every avatar.
+AVATAR_SIZES = (48, 96, 128)
 ADMIN_PROFILE = (
     "https://upload.wikimedia.org/wikipedia/commons/b/b4/Wikipe-tan_avatar.png"
 )
+# Non-urgent notifications are collected per recipient and sent as one digest
+# every NOTIFICATION_DIGEST_WINDOW seconds, 0 sends each notice on its own.
+NOTIFICATION_DIGEST_WINDOW = config("NOTIFICATION_DIGEST_WINDOW", default=900, cast=int)
+# Notices about sessions starting sooner than this (in seconds) skip the digest.
+NOTIFICATION_URGENT_WITHIN = config(
+    "NOTIFICATION_URGENT_WITHIN", default=86400, cast=int
+)
+# Count booking week cache hits and misses for week_cache_stats. Counts are
+# kept per process and added to the cache about once a minute.
+CACHE_STATS = config("CACHE_STATS", default=False, cast=bool)
+# History exports larger than this many bytes are gzipped before mailing.
+EXPORT_COMPRESS_THRESHOLD = config(
+    "EXPORT_COMPRESS_THRESHOLD", default=1024 * 1024, cast=int
+)
@@ -28,10 +28,14 @@ STATIC_ROOT = BASE_DIR / "staticfiles"  # noqa
 # CACHES
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# Version counters, cached week grids, fragments and cache statistics must be
+# seen by every worker process and by management commands, so the cache lives
+# in the database. Create its table with `python manage.py createcachetable`.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "",
+        "BACKEND": "main.cache.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
     }
 }
 
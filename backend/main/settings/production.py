@@ -22,6 +22,19 @@ STATIC_ROOT = os.path.join("/var/www/MVISGuidance/", "static")
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-root
 MEDIA_ROOT = os.path.join("/var/www/MVISGuidance/", "media")
 
+# CACHES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+# Version counters, cached week grids, fragments and cache statistics must be
+# seen by every gunicorn worker and by management commands, so the cache lives
+# in the database. Create its table with `python manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": "main.cache.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
 
 # SECURITY
 # ------------------------------------------------------------------------------
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.contrib import admin
 from guardian.admin import GuardedModelAdmin
-from scheduler.models import Session
+from scheduler.models import ExportJob, OutboxMessage, Session, Unavailability
 
 
 class SessionAdmin(GuardedModelAdmin):
@@ -10,3 +10,26 @@ class SessionAdmin(GuardedModelAdmin):
 
 
 admin.site.register(Session, SessionAdmin)
+
+
+class UnavailabilityAdmin(admin.ModelAdmin):
+    list_display = ("teacher", "date", "start_timeblock", "end_timeblock")
+
+
+admin.site.register(Unavailability, UnavailabilityAdmin)
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "send_after", "sent_at")
+    list_filter = ("status",)
+
+
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
+
+
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("user", "status", "rows", "date_created", "finished_at")
+    list_filter = ("status",)
+
+
+admin.site.register(ExportJob, ExportJobAdmin)
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import datetime
+import hashlib
+from typing import TYPE_CHECKING, cast
+
+from django.contrib import auth
+from django.core.cache import cache
+from django.utils import timezone
+from scheduler.cache import count, get_counts, get_versions
+from scheduler.models import TIME_GRID, Session, SlotOccupancy, Unavailability
+
+if TYPE_CHECKING:
+    from typing import Any, Optional, Type
+
+    from django.contrib.auth.models import AbstractUser
+
+User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
+
+WEEK_CACHE_KEY = (
+    "scheduler:week:{teacher}:{student}:{start}:{window}"
+    ":{teacher_version}:{student_version}"
+)
+WEEK_CACHE_WINDOW = datetime.timedelta(minutes=30)
+
+
+def booking_window(is_self: bool, now: datetime.datetime):
+    earliest_book_time = (
+        now + datetime.timedelta(hours=1)
+        if is_self
+        else now + datetime.timedelta(hours=12)
+    )
+    latest_book_time = None if is_self else now + datetime.timedelta(weeks=1)
+    return earliest_book_time, latest_book_time
+
+
+def cache_window(now: datetime.datetime):
+    # Past/future cut-offs only move when "now" crosses a half hour, so
+    # computed availability stays valid until the end of the current window.
+    return now.replace(minute=now.minute - now.minute % 30, second=0, microsecond=0)
+
+
+def week_days(now: datetime.datetime, week: int = 0) -> list[datetime.date]:
+    startday = now.date() + datetime.timedelta(
+        weeks=week + (1 if now.weekday() > 5 else 0), days=-now.weekday()
+    )
+    return [startday + datetime.timedelta(days=i) for i in range(5)]
+
+
+class SlotTable:
+    def __init__(
+        self,
+        student: AbstractUser,
+        teacher: AbstractUser,
+        start: datetime.date,
+        end: datetime.date,
+    ):
+        self.student = student
+        self.teacher = teacher
+        self.start = start
+        self.end = end
+        self.occupancy = SlotOccupancy.objects.for_users(
+            {student.pk, teacher.pk}, start, end
+        )
+
+    def masks(self, day: datetime.date):
+        student = self.occupancy.get((self.student.pk, day))
+        teacher = self.occupancy.get((self.teacher.pk, day))
+        booked = student.student_mask | student.blocked_mask if student else 0
+        full = teacher.teacher_mask | teacher.blocked_mask if teacher else 0
+        taken = teacher.teacher_mask if teacher else 0
+        return booked, full, taken
+
+    def available(self, day: datetime.date, past: int, future: int):
+        booked, full, _taken = self.masks(day)
+        return TIME_GRID.full_mask & ~(past | future | booked | full)
+
+    def sessions(self, role: str):
+        if not any(
+            occupancy.user_id == getattr(self, role).pk and occupancy.mask
+            for occupancy in self.occupancy.values()
+        ):
+            return {}
+        sessions = (
+            Session.objects.filter(date__range=(self.start, self.end))
+            .filter(**{role: getattr(self, role)})
+            .select_related("student__profile", "teacher__profile")
+            .order_by("-pk")
+        )
+        return {(session.date, session.timeblock): session for session in sessions}
+
+    def blocks(self):
+        if not any(
+            occupancy.user_id == self.teacher.pk and occupancy.blocked_mask
+            for occupancy in self.occupancy.values()
+        ):
+            return {}
+        return {
+            (block.date, key): block
+            for block in Unavailability.objects.filter(
+                teacher=self.teacher, date__range=(self.start, self.end)
+            ).order_by("pk")
+            for key in block.timeblocks
+        }
+
+
+def generate_week_data(
+    student: AbstractUser,
+    teacher: AbstractUser,
+    week: int = 0,
+    now: Optional[datetime.datetime] = None,
+):
+    if not teacher:
+        return []
+    is_self = student.pk == teacher.pk
+    data_week = []
+    now = now or timezone.localtime()
+    earliest_book_time, latest_book_time = booking_window(is_self, now)
+    days = week_days(now, week)
+    table = SlotTable(student, teacher, days[0], days[-1])
+    sessions = table.sessions("teacher" if is_self else "student")
+    blocks = table.blocks() if is_self else {}
+    for curr_day in days:
+        data_day: dict[str, Any] = {}
+        weekday = curr_day.strftime("%A").upper()
+        data_day["date"] = str(curr_day)
+        data_day["weekday"] = weekday
+        data_day["timeblocks"] = {}
+        past = TIME_GRID.past_mask(curr_day, earliest_book_time)
+        future = TIME_GRID.future_mask(curr_day, latest_book_time)
+        booked, full, taken = table.masks(curr_day)
+        unavaliable = past | future | booked | full
+        for key, time in TIME_GRID.timeblocks:
+            data_day["timeblocks"][key] = {
+                "label": time,
+                "is_avaliable": not unavaliable & TIME_GRID.bits[key],
+                "session": sessions.get((curr_day, key)),
+                "block": blocks.get((curr_day, key)),
+            }
+        if is_self:
+            data_day["timeblocks_teacher"] = {}
+            for key, text, _time_keys in Session.TEACHER_TIMEBLOCK:
+                is_closed = TIME_GRID.is_closed(key, past, future)
+                data_day["timeblocks_teacher"][key] = {
+                    "label": text,
+                    "is_avaliable": not (is_closed or taken & TIME_GRID.bits[key]),
+                }
+
+        data_week.append(data_day)
+    return data_week
+
+
+def get_week_data(student: AbstractUser, teacher: AbstractUser, week: int = 0):
+    if not teacher:
+        return []
+    now = timezone.localtime()
+    window = cache_window(now)
+    versions = get_versions("user", (teacher.pk, student.pk))
+    key = WEEK_CACHE_KEY.format(
+        teacher=teacher.pk,
+        student=student.pk,
+        start=week_days(now, week)[0],
+        window=window.strftime("%Y%m%d%H%M"),
+        teacher_version=versions[teacher.pk],
+        student_version=versions[student.pk],
+    )
+    data = cache.get(key)
+    if data is None:
+        count("week_cache_misses")
+        data = generate_week_data(student, teacher, week, now)
+        timeout = window + WEEK_CACHE_WINDOW - now
+        cache.set(key, data, max(int(timeout.total_seconds()), 1))
+    else:
+        count("week_cache_hits")
+    return data
+
+
+def to_bits(mask: int):
+    return format(mask, f"0{len(TIME_GRID.timeblocks)}b")[::-1]
+
+
+def range_availability(
+    student: AbstractUser,
+    teacher: AbstractUser,
+    start: datetime.date,
+    end: datetime.date,
+):
+    now = timezone.localtime()
+    is_self = student.pk == teacher.pk
+    earliest_book_time, latest_book_time = booking_window(is_self, now)
+    table = SlotTable(student, teacher, start, end)
+    days = {}
+    booked = {}
+    for offset in range((end - start).days + 1):
+        day = start + datetime.timedelta(days=offset)
+        if day.weekday() > 4:
+            continue
+        past = TIME_GRID.past_mask(day, earliest_book_time)
+        future = TIME_GRID.future_mask(day, latest_book_time)
+        days[str(day)] = to_bits(table.available(day, past, future))
+        mask = table.masks(day)[1 if is_self else 0]
+        if mask:
+            booked[str(day)] = to_bits(mask)
+    return {
+        "teacher": teacher.pk,
+        "start": str(start),
+        "end": str(end),
+        "timeblocks": "".join(key for key, _label in TIME_GRID.timeblocks),
+        "days": days,
+        "booked": booked,
+    }
+
+
+def range_etag(student: AbstractUser, teacher: AbstractUser, start, end):
+    versions = get_versions("user", (teacher.pk, student.pk))
+    return hashlib.md5(
+        f"{teacher.pk}:{student.pk}:{start}:{end}"
+        f":{cache_window(timezone.localtime()):%Y%m%d%H%M}"
+        f":{versions[teacher.pk]}:{versions[student.pk]}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+
+
+def room_masks(location: Optional[str], start: datetime.date, end: datetime.date):
+    masks: dict[datetime.date, int] = {}
+    if location is None or location in Session.SHARED_LOCATIONS:
+        return masks
+    for day, timeblock in Session.objects.filter(
+        date__range=(start, end), location=location
+    ).values_list("date", "timeblock"):
+        masks[day] = masks.get(day, 0) | TIME_GRID.bits.get(timeblock, 0)
+    return masks
+
+
+def find_next_available(
+    student: AbstractUser,
+    start: datetime.date,
+    end: datetime.date,
+    limit: int = 10,
+    location: Optional[str] = None,
+):
+    now = timezone.localtime()
+    earliest_book_time, latest_book_time = booking_window(False, now)
+    teachers = list(
+        User.objects.filter(profile__is_teacher=True)
+        .exclude(pk=student.pk)
+        .select_related("profile")
+        .order_by("pk")
+    )
+    occupancy = SlotOccupancy.objects.for_users(
+        [teacher.pk for teacher in teachers] + [student.pk], start, end
+    )
+    rooms = room_masks(location, start, end)
+    slots: list[dict[str, Any]] = []
+    for offset in range((end - start).days + 1):
+        day = start + datetime.timedelta(days=offset)
+        if day.weekday() > 4:
+            continue
+        student_occupancy = occupancy.get((student.pk, day))
+        closed = (
+            TIME_GRID.past_mask(day, earliest_book_time)
+            | TIME_GRID.future_mask(day, latest_book_time)
+            | (student_occupancy.mask if student_occupancy else 0)
+            | rooms.get(day, 0)
+        )
+        if closed & TIME_GRID.full_mask == TIME_GRID.full_mask:
+            continue
+        busy = {
+            teacher.pk: occupancy[(teacher.pk, day)].mask
+            for teacher in teachers
+            if (teacher.pk, day) in occupancy
+        }
+        for key, label in TIME_GRID.timeblocks:
+            bit = TIME_GRID.bits[key]
+            if closed & bit:
+                continue
+            for teacher in teachers:
+                if busy.get(teacher.pk, 0) & bit:
+                    continue
+                slots.append(
+                    {
+                        "date": day,
+                        "timeblock": key,
+                        "label": label,
+                        "teacher": teacher,
+                    }
+                )
+                if len(slots) >= limit:
+                    return slots
+    return slots
+
+
+def week_cache_stats():
+    counts = get_counts("week_cache_hits", "week_cache_misses")
+    return {
+        "hits": counts["week_cache_hits"],
+        "misses": counts["week_cache_misses"],
+    }
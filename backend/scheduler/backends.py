@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.contrib.auth.backends import BaseBackend
+from scheduler.models import Session
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from django.contrib.auth.models import AbstractUser
+
+
+class SessionPermissionBackend(BaseBackend):
+    SESSION_PERMISSIONS = frozenset(
+        {
+            "scheduler.view_session",
+            "scheduler.change_session",
+            "scheduler.delete_session",
+        }
+    )
+
+    def get_user_permissions(self, user_obj: AbstractUser, obj: Any = None):
+        if (
+            isinstance(obj, Session)
+            and user_obj.is_active
+            and user_obj.pk in (obj.student_id, obj.teacher_id)  # type: ignore
+        ):
+            return set(self.SESSION_PERMISSIONS)
+        return set()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from scheduler.cache import deferred_bumps
+from scheduler.models import TIME_GRID, Session, SlotOccupancy, Unavailability
+
+if TYPE_CHECKING:
+    import datetime
+
+
+def book_session(session: Session):
+    # Locking the teacher's and student's occupancy rows for the day
+    # serializes bookings that could collide while leaving other teachers
+    # and days free to book concurrently.
+    try:
+        with transaction.atomic():
+            occupancies = SlotOccupancy.objects.lock(session.occupancy_keys())
+            if session.is_slot_taken(occupancies):
+                raise ValidationError(Session.SLOT_TAKEN_MESSAGE, code="conflict")
+            session.save()
+    except IntegrityError as error:
+        raise ValidationError(Session.SLOT_TAKEN_MESSAGE, code="conflict") from error
+    return session
+
+
+def block_slots(teacher_id: int, day: datetime.date, key: str):
+    start, end = TIME_GRID.ranges[key]
+    with transaction.atomic(), SlotOccupancy.objects.deferred(), deferred_bumps():
+        SlotOccupancy.objects.lock({(teacher_id, day)})
+        displaced = list(
+            Session.objects.filter(
+                date=day,
+                teacher_id=teacher_id,
+                timeblock__in=TIME_GRID.keys(TIME_GRID.span_mask(start, end)),
+            ).select_related("student", "teacher")
+        )
+        if displaced:
+            Session.objects.filter(
+                pk__in=[session.pk for session in displaced]
+            ).delete()
+        Unavailability.objects.filter(
+            teacher_id=teacher_id,
+            date=day,
+            start_timeblock__gte=start,
+            end_timeblock__lte=end,
+        ).delete()
+        Unavailability.objects.create(
+            teacher_id=teacher_id,
+            date=day,
+            start_timeblock=start,
+            end_timeblock=end,
+        )
+    return displaced
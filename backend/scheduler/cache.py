@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import itertools
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.safestring import mark_safe
+
+if TYPE_CHECKING:
+    from typing import Callable, Hashable, Iterable, Iterator, Optional
+
+VERSION_KEY = "scheduler:version:{namespace}:{pk}"
+STATS_KEY = "scheduler:stats:{name}"
+FRAGMENT_KEY = "scheduler:fragment:{name}:{parts}"
+# Fragment keys carry versions, but writes that send no signals, such as
+# queryset updates, do not bump them. Keep such a stale fragment short-lived.
+FRAGMENT_TIMEOUT = 60 * 5
+DIRECTORY = "teachers"
+# Seconds between adding a process's stats counts to the shared cache.
+STATS_FLUSH_INTERVAL = 60
+
+_sequence = itertools.count()
+_counts: Counter = Counter()
+_counts_lock = threading.Lock()
+_flushed_at = time.monotonic()
+_deferred_bumps: ContextVar[Optional[dict[str, set]]] = ContextVar(
+    "deferred_version_bumps", default=None
+)
+
+
+def _seed():
+    # Versions come from the clock so an evicted or bumped counter never
+    # falls back to a value that older cache entries were written with. The
+    # sequence keeps two bumps within the same microsecond apart.
+    return time.time_ns() // 1000 * 1000 + next(_sequence) % 1000
+
+
+def _incr(key: str, delta: int):
+    if cache.add(key, delta, timeout=None):
+        return delta
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.set(key, delta, timeout=None)
+        return delta
+
+
+def get_versions(namespace: str, pks: Iterable[Hashable]):
+    return get_many_versions({namespace: pks})[namespace]
+
+
+def get_many_versions(pks_by_namespace: dict[str, Iterable[Hashable]]):
+    # Versions of several namespaces in one cache round trip.
+    keys = {
+        (namespace, pk): VERSION_KEY.format(namespace=namespace, pk=pk)
+        for namespace, pks in pks_by_namespace.items()
+        for pk in pks
+    }
+    versions = cache.get_many(keys.values())
+    missing = {key: _seed() for key in keys.values() if key not in versions}
+    for key, version in missing.items():
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+        versions[key] = version
+    found: dict[str, dict[Hashable, int]] = {
+        namespace: {} for namespace in pks_by_namespace
+    }
+    for (namespace, pk), key in keys.items():
+        found[namespace][pk] = versions[key]
+    return found
+
+
+def bump_versions(namespace: str, pks: Iterable[Hashable]):
+    pending = _deferred_bumps.get()
+    if pending is not None:
+        pending.setdefault(namespace, set()).update(pks)
+        return
+    _bump({namespace: pks})
+
+
+def _bump(pks_by_namespace: dict[str, Iterable[Hashable]]):
+    keys = [
+        VERSION_KEY.format(namespace=namespace, pk=pk)
+        for namespace, pks in pks_by_namespace.items()
+        for pk in set(pks)
+    ]
+    if not keys:
+        return
+    # Bumping before commit would let a concurrent reader cache data from
+    # before the change under the new version. A bump writes a fresh value
+    # instead of incrementing, so bumps racing in different processes cannot
+    # collapse into one on caches without an atomic incr.
+    transaction.on_commit(
+        lambda: cache.set_many(dict.fromkeys(keys, _seed()), timeout=None)
+    )
+
+
+@contextlib.contextmanager
+def deferred_bumps() -> Iterator[None]:
+    # Collects the bumps made inside the block and writes them in one go, so
+    # bulk writes queue one cache write instead of one per row and namespace.
+    if _deferred_bumps.get() is not None:
+        yield
+        return
+    pending: dict[str, set] = {}
+    token = _deferred_bumps.set(pending)
+    try:
+        yield
+    finally:
+        _deferred_bumps.reset(token)
+    _bump(pending)
+
+
+def bump_profiles(user_ids: Iterable[int]):
+    # Names, avatars and the teacher flag show up in profile fragments, in
+    # session cards and in the teacher directory.
+    user_ids = set(user_ids)
+    if user_ids:
+        bump_versions("profile", user_ids)
+        bump_versions("directory", (DIRECTORY,))
+
+
+def get_fragment(name: str, parts: Iterable[Hashable], render: Callable[[], str]):
+    key = FRAGMENT_KEY.format(name=name, parts=":".join(str(part) for part in parts))
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, FRAGMENT_TIMEOUT)
+    return mark_safe(html)
+
+
+def versions_shared():
+    # A per-process cache hides bumps made by other workers, so its versions
+    # must not be used to tell a client that its copy is still current.
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def count(name: str):
+    # Counted in memory so reads stay reads; the shared cache only sees one
+    # write per name and process every STATS_FLUSH_INTERVAL seconds.
+    if not settings.CACHE_STATS:
+        return
+    with _counts_lock:
+        _counts[name] += 1
+        due = time.monotonic() - _flushed_at >= STATS_FLUSH_INTERVAL
+    if due:
+        flush_counts()
+
+
+@atexit.register
+def flush_counts():
+    global _flushed_at  # pylint: disable=W0603
+    with _counts_lock:
+        pending = dict(_counts)
+        _counts.clear()
+        _flushed_at = time.monotonic()
+    for name, value in pending.items():
+        _incr(STATS_KEY.format(name=name), value)
+
+
+def get_counts(*names: str):
+    keys = {name: STATS_KEY.format(name=name) for name in names}
+    counts = cache.get_many(keys.values())
+    return {name: counts.get(key, 0) for name, key in keys.items()}
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import gzip
+import importlib.util
+import io
+import itertools
+import shutil
+import tempfile
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from scheduler import notifications
+from scheduler.models import TIME_GRID, ExportJob, OutboxMessage, Session
+
+if TYPE_CHECKING:
+    from typing import IO, Iterable, Iterator, Optional
+
+    from django.contrib.auth.models import AbstractUser
+
+HISTORY_HEADER = ["student", "teacher", "date", "timeblock", "location"]
+CHUNK_SIZE = 2000
+SESSION_COLUMNS = (
+    "id",
+    "student",
+    "teacher",
+    "date",
+    "timeblock",
+    "location",
+    "date_posted",
+)
+# format: (content type, file extension)
+SESSION_EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+# A job still running after this long was lost with its worker process.
+STALE_AFTER = datetime.timedelta(hours=1)
+
+
+def start_history_export(user: AbstractUser):
+    # Repeated clicks while an export is under way point at the same job,
+    # run_exports picks it up from the table.
+    job = (
+        ExportJob.objects.filter(
+            user=user, status__in=[ExportJob.PENDING, ExportJob.RUNNING]
+        )
+        .order_by("-date_created")
+        .first()
+    )
+    if job is None:
+        job = ExportJob.objects.create(user=user)
+    return job
+
+
+def history_rows(teacher_id: int):
+    sessions = (
+        Session.objects.filter(teacher_id=teacher_id, date__lt=timezone.localdate())
+        .select_related("student", "teacher")
+        .only("date", "timeblock", "location", "student__username", "teacher__username")
+        .order_by("date", "timeblock")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for session in sessions:
+        yield [
+            session.student.username,
+            session.teacher.username,
+            session.date.strftime("%d/%m/%Y"),
+            TIME_GRID.labels[session.timeblock],
+            session.location,
+        ]
+
+
+def write_csv(buffer: IO[bytes], rows: Iterable[list[str]]):
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    writer = csv.writer(text)
+    writer.writerow(HISTORY_HEADER)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    text.flush()
+    text.detach()
+    return count
+
+
+def attachment(buffer: IO[bytes], name: str, mimetype: str):
+    size = buffer.tell()
+    buffer.seek(0)
+    if size <= settings.EXPORT_COMPRESS_THRESHOLD:
+        return name, buffer.read(), mimetype, False
+    compressed = io.BytesIO()
+    with gzip.GzipFile(filename=name, mode="wb", fileobj=compressed) as archive:
+        shutil.copyfileobj(buffer, archive)
+    return f"{name}.gz", compressed.getvalue(), "application/gzip", True
+
+
+def run_history_export(job: ExportJob):
+    try:
+        with tempfile.SpooledTemporaryFile(
+            max_size=settings.EXPORT_COMPRESS_THRESHOLD
+        ) as buffer:
+            rows = write_csv(buffer, history_rows(job.user_id))  # type: ignore
+            filename, content, mimetype, compressed = attachment(
+                buffer, "data.csv", "text/csv"
+            )
+    except Exception as error:
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.FAILED, error=str(error), finished_at=timezone.now()
+        )
+        raise
+    with transaction.atomic():
+        for message in OutboxMessage.objects.enqueue(
+            *notifications.history_exported(job.user)
+        ):
+            message.attachments.create(
+                filename=filename, content=content, mimetype=mimetype
+            )
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.DONE,
+            rows=rows,
+            compressed=compressed,
+            finished_at=timezone.now(),
+        )
+
+
+def session_export_filters(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    teacher: Optional[str] = None,
+    location: Optional[str] = None,
+):
+    filters: dict[str, object] = {}
+    try:
+        if start:
+            filters["date__gte"] = datetime.date.fromisoformat(start)
+        if end:
+            filters["date__lte"] = datetime.date.fromisoformat(end)
+    except ValueError as error:
+        raise ValidationError("Invalid date.", code="invalid") from error
+    if teacher:
+        filters["teacher__username"] = teacher
+    if location:
+        if location not in dict(Session.LOCATION_CHOICES):
+            raise ValidationError("Unknown location.", code="invalid")
+        filters["location"] = location
+    return filters
+
+
+def session_export_chunks(filters: dict[str, object], chunk_size: int = CHUNK_SIZE):
+    # iterator() reads through a server-side cursor where the database has
+    # them, so only one chunk of rows is held at a time.
+    rows = (
+        Session.objects.filter(**filters)
+        .order_by("pk")
+        .values_list(
+            "pk",
+            "student__username",
+            "teacher__username",
+            "date",
+            "timeblock",
+            "location",
+            "date_posted",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        yield chunk
+
+
+def csv_stream(chunks: Iterable[list[tuple]]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SESSION_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def jsonl_stream(chunks: Iterable[list[tuple]]):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for chunk in chunks:
+        yield "".join(
+            encoder.encode(dict(zip(SESSION_COLUMNS, row))) + "\n" for row in chunk
+        ).encode()
+
+
+class ChunkSink(io.RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet_stream(chunks: Iterable[list[tuple]]):
+    # pyarrow is optional, only parquet exports need it.
+    import pyarrow  # pylint: disable=C0415
+    import pyarrow.parquet  # pylint: disable=C0415
+
+    schema = pyarrow.schema(
+        [
+            ("id", pyarrow.int64()),
+            ("student", pyarrow.string()),
+            ("teacher", pyarrow.string()),
+            ("date", pyarrow.date32()),
+            ("timeblock", pyarrow.string()),
+            ("location", pyarrow.string()),
+            ("date_posted", pyarrow.timestamp("us", tz="UTC")),
+        ]
+    )
+    sink = ChunkSink()
+    # Each chunk becomes one row group, flushed to the client as it is written.
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(
+                pyarrow.Table.from_arrays(
+                    [
+                        pyarrow.array(column, type=field.type)
+                        for column, field in zip(zip(*chunk), schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+    yield sink.drain()
+
+
+def session_export_available(format_: str):
+    if format_ == "parquet":
+        return importlib.util.find_spec("pyarrow") is not None
+    return format_ in SESSION_EXPORT_FORMATS
+
+
+def session_export_stream(
+    format_: str, filters: dict[str, object], chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    streams = {"csv": csv_stream, "jsonl": jsonl_stream, "parquet": parquet_stream}
+    return streams[format_](session_export_chunks(filters, chunk_size))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import datetime
+import random
+import time
+from typing import TYPE_CHECKING, cast
+
+from django.contrib import auth
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.utils import timezone
+from scheduler import notifications
+from scheduler.models import TIME_GRID, Session
+
+if TYPE_CHECKING:
+    from typing import Callable, Type
+
+    from django.contrib.auth.models import AbstractUser
+
+User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
+
+
+class Command(BaseCommand):
+    help = "Measure the per-message cost of rendering session notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=None)
+
+    # Measure with the template cache in place, as it runs in production.
+    @override_settings(DEBUG=False)
+    def handle(self, *args, **kwargs):
+        rng = random.Random(kwargs["seed"])
+        sessions = self.make_sessions(rng, max(kwargs["messages"], 1))
+        requested = sessions[0].teacher
+        # Warm the template cache so the first run is not charged for loading.
+        notifications.sessions_cancelled(requested, sessions[:1])
+        self.measure(
+            "date (strftime round-trip)",
+            sessions,
+            kwargs["repeat"],
+            lambda: [
+                session.date.strftime(
+                    "วันที่ %d เดือน %B ปี %Y".encode("unicode-escape").decode()
+                )
+                .encode()
+                .decode("unicode-escape")
+                for session in sessions
+            ],
+        )
+        self.measure(
+            "date (thai_date)",
+            sessions,
+            kwargs["repeat"],
+            lambda: [notifications.thai_date(session.date) for session in sessions],
+        )
+        self.measure(
+            "create (one at a time)",
+            sessions,
+            kwargs["repeat"],
+            lambda: [
+                notifications.session_created(session, "topic") for session in sessions
+            ],
+        )
+        self.measure(
+            "edit (one at a time)",
+            sessions,
+            kwargs["repeat"],
+            lambda: [notifications.session_edited(session) for session in sessions],
+        )
+        self.measure(
+            "cancel (batch)",
+            sessions,
+            kwargs["repeat"],
+            lambda: notifications.sessions_cancelled(requested, sessions),
+        )
+
+    def make_sessions(self, rng: random.Random, count: int):
+        teachers = [
+            User(pk=i, username=f"teacher-{i}", email=f"teacher-{i}@example.com")
+            for i in range(1, 11)
+        ]
+        students = [
+            User(pk=i, username=f"student-{i}", email=f"student-{i}@example.com")
+            for i in range(11, 111)
+        ]
+        timeblocks = [key for key, _label in TIME_GRID.timeblocks]
+        today = timezone.localdate()
+        return [
+            Session(
+                student=rng.choice(students),
+                teacher=rng.choice(teachers),
+                date=today + datetime.timedelta(days=rng.randrange(365)),
+                timeblock=rng.choice(timeblocks),
+                location=rng.choice(["online", "onsite"]),
+            )
+            for _i in range(count)
+        ]
+
+    def measure(
+        self,
+        label: str,
+        sessions: list[Session],
+        repeat: int,
+        func: Callable[[], object],
+    ):
+        best = float("inf")
+        for _i in range(max(repeat, 1)):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        self.stdout.write(f"{label}: {best / len(sessions) * 1e6:.1f} µs/message")
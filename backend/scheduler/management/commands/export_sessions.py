@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from scheduler.exports import (
+    CHUNK_SIZE,
+    SESSION_EXPORT_FORMATS,
+    session_export_available,
+    session_export_filters,
+    session_export_stream,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream sessions to a CSV, JSON Lines or Parquet file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format", choices=sorted(SESSION_EXPORT_FORMATS), default="csv"
+        )
+        parser.add_argument("--output", default="-")
+        parser.add_argument("--start")
+        parser.add_argument("--end")
+        parser.add_argument("--teacher")
+        parser.add_argument("--location")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **kwargs):
+        if not session_export_available(kwargs["format"]):
+            raise CommandError("Parquet exports need pyarrow installed.")
+        try:
+            filters = session_export_filters(
+                kwargs["start"], kwargs["end"], kwargs["teacher"], kwargs["location"]
+            )
+        except ValidationError as error:
+            raise CommandError(" ".join(error.messages)) from error
+        stream = session_export_stream(
+            kwargs["format"], filters, max(kwargs["chunk_size"], 1)
+        )
+        if kwargs["output"] == "-":
+            self.write(sys.stdout.buffer, stream)
+        else:
+            with open(kwargs["output"], "wb") as output:
+                self.write(output, stream)
+
+    def write(self, output, stream):
+        for data in stream:
+            output.write(data)
+        output.flush()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from scheduler.permissions import (
+    find_orphan_permissions,
+    object_permission_models,
+    table_size,
+)
+
+
+class Command(BaseCommand):
+    help = "Find and delete object permissions whose target no longer exists"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **kwargs):
+        for model in object_permission_models():
+            name = model._meta.label
+            self.report(name, model)
+            found = deleted = 0
+            for orphans in find_orphan_permissions(model, kwargs["chunk_size"]):
+                found += len(orphans)
+                if not kwargs["dry_run"]:
+                    deleted += model.objects.filter(  # type: ignore
+                        pk__in=orphans
+                    ).delete()[0]
+            self.stdout.write(f"{name}: {found} orphan(s) found, {deleted} deleted")
+            if deleted:
+                self.report(name, model)
+
+    def report(self, name, model):
+        rows, size = table_size(model)
+        self.stdout.write(
+            f"{name}: {rows} row(s)"
+            + (f", {size / 1024:.1f} KiB on disk" if size is not None else "")
+        )
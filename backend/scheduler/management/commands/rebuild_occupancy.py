@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from scheduler.models import SlotOccupancy
+
+
+class Command(BaseCommand):
+    help = "Rebuild slot occupancy masks from sessions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            count = SlotOccupancy.objects.rebuild(batch_size=kwargs["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} occupancy row(s)"))
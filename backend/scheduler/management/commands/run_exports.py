@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from scheduler.exports import STALE_AFTER, run_history_export
+from scheduler.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = "Run queued history exports and queue their emails in the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--poll-interval", type=float, default=5)
+        parser.add_argument(
+            "--lease", type=int, default=int(STALE_AFTER.total_seconds())
+        )
+
+    def handle(self, *args, **kwargs):
+        lease = datetime.timedelta(seconds=kwargs["lease"])
+        while True:
+            job = ExportJob.objects.claim(lease)
+            if job is not None:
+                try:
+                    run_history_export(job)
+                except Exception as error:  # pylint: disable=W0703
+                    self.stderr.write(f"export {job.pk} failed: {error}")
+                else:
+                    self.stdout.write(f"export {job.pk} done")
+                continue
+            if kwargs["once"]:
+                break
+            time.sleep(kwargs["poll_interval"])
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import datetime
+import time
+
+from django.core import mail
+from django.core.management.base import BaseCommand
+from django.db.models import prefetch_related_objects
+from scheduler.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox messages over one SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--poll-interval", type=float, default=5)
+        parser.add_argument("--max-attempts", type=int, default=8)
+        parser.add_argument("--retry-delay", type=int, default=60)
+        parser.add_argument("--max-retry-delay", type=int, default=3600)
+        parser.add_argument("--lease", type=int, default=300)
+
+    def handle(self, *args, **kwargs):
+        self.options = kwargs
+        connection = mail.get_connection()
+        try:
+            while True:
+                messages = OutboxMessage.objects.claim(
+                    kwargs["batch_size"], datetime.timedelta(seconds=kwargs["lease"])
+                )
+                if messages:
+                    self.deliver(connection, messages)
+                    continue
+                # Idle connections get dropped by most servers, so only hold
+                # one open while there is something to send.
+                connection.close()
+                if kwargs["once"]:
+                    break
+                time.sleep(kwargs["poll_interval"])
+        finally:
+            connection.close()
+
+    def deliver(self, connection, messages: list[OutboxMessage]):
+        prefetch_related_objects(messages, "attachments")
+        groups: dict[tuple, list[OutboxMessage]] = {}
+        for message in messages:
+            key = (
+                (message.from_email, *message.recipients)
+                if message.digest
+                else (message.pk,)
+            )
+            groups.setdefault(key, []).append(message)
+        sent = failed = 0
+        for group in groups.values():
+            subject, body, html_body = compose(group)
+            email = mail.EmailMultiAlternatives(
+                subject,
+                body,
+                group[0].from_email or None,
+                group[0].recipients,
+                connection=connection,
+            )
+            if html_body:
+                email.attach_alternative(html_body, "text/html")
+            for message in group:
+                for attachment in message.attachments.all():
+                    email.attach(
+                        attachment.filename,
+                        bytes(attachment.content),
+                        attachment.mimetype,
+                    )
+            try:
+                connection.open()
+                email.send()
+            except Exception as error:  # pylint: disable=W0703
+                # Drop the connection so the next message starts on a fresh one.
+                connection.close()
+                for message in group:
+                    OutboxMessage.objects.mark_failed(
+                        message,
+                        error,
+                        self.options["max_attempts"],
+                        datetime.timedelta(seconds=self.options["retry_delay"]),
+                        datetime.timedelta(seconds=self.options["max_retry_delay"]),
+                    )
+                failed += 1
+            else:
+                OutboxMessage.objects.mark_sent(group)
+                sent += 1
+        self.stdout.write(
+            f"sent: {sent}, failed: {failed}, notifications: {len(messages)}"
+        )
+
+
+def compose(messages: list[OutboxMessage]):
+    if len(messages) == 1:
+        return messages[0].subject, messages[0].body, messages[0].html_body
+    # Digests go out as plain text only.
+    return (
+        f"สรุปการแจ้งเตือน {len(messages)} รายการ",
+        "\n\n".join(
+            f"{i}. {message.subject}\n\n{message.body}"
+            for i, message in enumerate(messages, start=1)
+        ),
+        "",
+    )
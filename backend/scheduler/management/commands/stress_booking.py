@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import datetime
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, cast
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+from django.db.models import Q
+from django.utils import timezone
+from scheduler.booking import book_session
+from scheduler.cache import bump_profiles
+from scheduler.models import TIME_GRID, Session, SlotOccupancy
+from users.models import TEACHER_GROUP, Profile
+
+if TYPE_CHECKING:
+    from typing import Type
+
+    from django.contrib.auth.models import AbstractUser
+
+User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
+
+USERNAME_PREFIX = "stress-booking-"
+
+Booking = tuple[int, int, datetime.date, str]
+
+
+def attempt_booking(booking: Booking):
+    student_id, teacher_id, day, timeblock = booking
+    session = Session(
+        student_id=student_id,
+        teacher_id=teacher_id,
+        date=day,
+        timeblock=timeblock,
+        location="online",
+    )
+    try:
+        session.validate_constraints(exclude=["date_posted"])
+        book_session(session)
+    except ValidationError:
+        return "conflicts"
+    except DatabaseError:
+        return "errors"
+    return "booked"
+
+
+def run_thread(bookings: list[Booking]):
+    try:
+        return Counter(attempt_booking(booking) for booking in bookings)
+    finally:
+        connection.close()
+
+
+def run_process(bookings: list[Booking], threads: int):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return sum(
+            executor.map(run_thread, [bookings[i::threads] for i in range(threads)]),
+            Counter(),
+        )
+
+
+class Command(BaseCommand):
+    help = "Fire concurrent bookings at the database and check for double bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=2000)
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--teachers", type=int, default=5)
+        parser.add_argument("--students", type=int, default=100)
+        parser.add_argument("--days", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--keep", action="store_true")
+        parser.add_argument("--force", action="store_true")
+
+    def handle(self, *args, **kwargs):
+        if not settings.DEBUG and not kwargs["force"]:
+            raise CommandError(
+                "Refusing to write stress data with DEBUG off, pass --force."
+            )
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError("Stress users already exist, run with a clean database.")
+        rng = random.Random(kwargs["seed"])
+        teachers, students = self.create_users(kwargs["teachers"], kwargs["students"])
+        try:
+            bookings = self.make_bookings(
+                rng, teachers, teachers + students, kwargs["days"], kwargs["bookings"]
+            )
+            processes = max(kwargs["processes"], 1)
+            connections.close_all()
+            started = time.perf_counter()
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                results = pool.starmap(
+                    run_process,
+                    [
+                        (bookings[i::processes], max(kwargs["threads"], 1))
+                        for i in range(processes)
+                    ],
+                )
+            elapsed = time.perf_counter() - started
+            totals = sum(results, Counter())
+            self.report(totals, len(bookings), elapsed)
+            self.verify(teachers + students)
+        finally:
+            if not kwargs["keep"]:
+                User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def create_users(self, teachers: int, students: int):
+        User.objects.bulk_create(
+            [
+                User(username=f"{USERNAME_PREFIX}teacher-{i}", password="!")
+                for i in range(teachers)
+            ]
+            + [
+                User(username=f"{USERNAME_PREFIX}student-{i}", password="!")
+                for i in range(students)
+            ]
+        )
+        ids = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        teacher_group, _created = Group.objects.get_or_create(name=TEACHER_GROUP)
+        Membership = User.groups.through
+        Membership.objects.bulk_create(
+            [
+                Membership(user_id=user_id, group_id=teacher_group.pk)
+                for user_id in ids[:teachers]
+            ]
+        )
+        # bulk_create skips the signals that create profiles and sync the flag.
+        Profile.objects.bulk_create(
+            [
+                Profile(user_id=user_id, is_teacher=i < teachers)
+                for i, user_id in enumerate(ids)
+            ]
+        )
+        bump_profiles(ids)
+        return ids[:teachers], ids[teachers:]
+
+    def make_bookings(
+        self,
+        rng: random.Random,
+        teachers: list[int],
+        students: list[int],
+        days: int,
+        count: int,
+    ):
+        weekdays: list[datetime.date] = []
+        day = timezone.localdate()
+        while len(weekdays) < days:
+            day += datetime.timedelta(days=1)
+            if day.weekday() < 5:
+                weekdays.append(day)
+        timeblocks = [key for key, _label in TIME_GRID.timeblocks]
+        bookings: list[Booking] = []
+        while len(bookings) < count:
+            teacher_id = rng.choice(teachers)
+            student_id = rng.choice(students)
+            if student_id == teacher_id:
+                continue
+            bookings.append(
+                (student_id, teacher_id, rng.choice(weekdays), rng.choice(timeblocks))
+            )
+        return bookings
+
+    def report(self, totals: Counter, attempts: int, elapsed: float):
+        self.stdout.write(
+            f"attempts: {attempts}\n"
+            f"booked: {totals['booked']}\n"
+            f"conflicts: {totals['conflicts']}\n"
+            f"errors: {totals['errors']}\n"
+            f"elapsed: {elapsed:.2f}s\n"
+            f"bookings/s: {totals['booked'] / elapsed:.1f}\n"
+            f"attempts/s: {attempts / elapsed:.1f}"
+        )
+
+    def verify(self, user_ids: list[int]):
+        rows = list(
+            Session.objects.filter(
+                Q(student_id__in=user_ids) | Q(teacher_id__in=user_ids)
+            ).values_list("student_id", "teacher_id", "date", "timeblock")
+        )
+        slots: Counter = Counter()
+        for student_id, teacher_id, day, timeblock in rows:
+            slots[(teacher_id, day, timeblock)] += 1
+            slots[(student_id, day, timeblock)] += 1
+        double_bookings = [slot for slot, used in slots.items() if used > 1]
+        expected = SlotOccupancy.objects.collect_masks(rows)
+        stored = {
+            (occupancy.user_id, occupancy.date): [
+                occupancy.teacher_mask,
+                occupancy.student_mask,
+                occupancy.blocked_mask,
+            ]
+            for occupancy in SlotOccupancy.objects.filter(user_id__in=user_ids)
+        }
+        drifted = [
+            key
+            for key in expected.keys() | stored.keys()
+            if expected.get(key, [0, 0, 0]) != stored.get(key, [0, 0, 0])
+        ]
+        self.stdout.write(
+            f"double bookings: {len(double_bookings)}\n"
+            f"stale occupancy rows: {len(drifted)}"
+        )
+        if double_bookings or drifted:
+            raise CommandError("Concurrent bookings left the schedule inconsistent.")
+        self.stdout.write(self.style.SUCCESS("No double bookings found"))
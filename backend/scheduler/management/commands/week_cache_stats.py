@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from scheduler.availability import week_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show booking week cache hit/miss counters"
+
+    def handle(self, *args, **kwargs):
+        if not settings.CACHE_STATS:
+            self.stderr.write("CACHE_STATS is off, so no new counts are recorded.")
+        stats = week_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(
+            f"hits: {stats['hits']}\nmisses: {stats['misses']}\nhit ratio: {ratio:.1%}"
+        )
@@ -0,0 +1,86 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+TIMEBLOCKS = "ABCDEFGHIJKLMNOP"
+
+
+def populate_occupancy(apps, schema_editor):
+    Session = apps.get_model("scheduler", "Session")
+    SlotOccupancy = apps.get_model("scheduler", "SlotOccupancy")
+    masks = {}
+    for student_id, teacher_id, day, timeblock in Session.objects.values_list(
+        "student_id", "teacher_id", "date", "timeblock"
+    ).iterator():
+        bit = 1 << TIMEBLOCKS.index(timeblock)
+        if student_id == teacher_id:
+            masks.setdefault((student_id, day), [0, 0, 0])[2] |= bit
+        else:
+            masks.setdefault((teacher_id, day), [0, 0, 0])[0] |= bit
+            masks.setdefault((student_id, day), [0, 0, 0])[1] |= bit
+    SlotOccupancy.objects.bulk_create(
+        [
+            SlotOccupancy(
+                user_id=user_id,
+                date=day,
+                teacher_mask=teacher_mask,
+                student_mask=student_mask,
+                blocked_mask=blocked_mask,
+            )
+            for (user_id, day), (
+                teacher_mask,
+                student_mask,
+                blocked_mask,
+            ) in masks.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("scheduler", "0002_teachersession"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlotOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("teacher_mask", models.IntegerField(default=0)),
+                ("student_mask", models.IntegerField(default=0)),
+                ("blocked_mask", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="slot_occupancy",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Slot Occupancy",
+                "verbose_name_plural": "Slot Occupancies",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="slotoccupancy",
+            constraint=models.UniqueConstraint(
+                fields=("user", "date"), name="unique_slot_occupancy"
+            ),
+        ),
+        migrations.RunPython(populate_occupancy, migrations.RunPython.noop),
+    ]
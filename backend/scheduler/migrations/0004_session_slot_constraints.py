@@ -0,0 +1,92 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def check_double_bookings(apps, schema_editor):
+    # Double bookings are real student bookings, so they are listed for
+    # someone to cancel or move instead of being deleted here.
+    Session = apps.get_model("scheduler", "Session")
+    conflicts = {}
+    for role in ("teacher", "student"):
+        duplicates = (
+            Session.objects.values(role, "date", "timeblock")
+            .annotate(count=models.Count("id"))
+            .filter(count__gt=1)
+        )
+        for duplicate in duplicates.iterator():
+            ids = tuple(
+                Session.objects.filter(
+                    **{
+                        role: duplicate[role],
+                        "date": duplicate["date"],
+                        "timeblock": duplicate["timeblock"],
+                    }
+                )
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            conflicts.setdefault(
+                ids,
+                f"{role} {duplicate[role]} on {duplicate['date']} "
+                f"timeblock {duplicate['timeblock']}: sessions "
+                + ", ".join(str(pk) for pk in ids),
+            )
+    if conflicts:
+        raise RuntimeError(
+            "Cannot add the one-session-per-slot constraints because these "
+            "slots are double booked. Cancel or move all but one session of "
+            "each slot, run migrate again, then run rebuild_occupancy so the "
+            "freed slots show as available.\n" + "\n".join(conflicts.values())
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("scheduler", "0003_slotoccupancy"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_double_bookings, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="session",
+            name="student",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="student_session",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="session",
+            name="teacher",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="teacher_session",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["date", "timeblock"], name="session_date_slot_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="session",
+            constraint=models.UniqueConstraint(
+                fields=("teacher", "date", "timeblock"), name="unique_teacher_slot"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="session",
+            constraint=models.UniqueConstraint(
+                fields=("student", "date", "timeblock"), name="unique_student_slot"
+            ),
+        ),
+    ]
@@ -0,0 +1,185 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+TIMEBLOCKS = "ABCDEFGHIJKLMNOP"
+
+
+def move_self_sessions(apps, schema_editor):
+    # Blocked masks keep the same bits, so occupancy needs no refresh.
+    Session = apps.get_model("scheduler", "Session")
+    Unavailability = apps.get_model("scheduler", "Unavailability")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    UserObjectPermission = apps.get_model("guardian", "UserObjectPermission")
+    sessions = Session.objects.filter(student=models.F("teacher"))
+    days: dict = {}
+    for teacher_id, day, timeblock in sessions.values_list(
+        "teacher_id", "date", "timeblock"
+    ).iterator():
+        days.setdefault((teacher_id, day), set()).add(TIMEBLOCKS.index(timeblock))
+    blocks = []
+    for (teacher_id, day), indexes in days.items():
+        start = None
+        for i in range(len(TIMEBLOCKS) + 1):
+            if i in indexes and start is None:
+                start = i
+            elif i not in indexes and start is not None:
+                blocks.append(
+                    Unavailability(
+                        teacher_id=teacher_id,
+                        date=day,
+                        start_timeblock=TIMEBLOCKS[start],
+                        end_timeblock=TIMEBLOCKS[i - 1],
+                    )
+                )
+                start = None
+    Unavailability.objects.bulk_create(blocks, batch_size=1000)
+    content_type = ContentType.objects.filter(
+        app_label="scheduler", model="session"
+    ).first()
+    if content_type is not None:
+        UserObjectPermission.objects.filter(
+            content_type=content_type,
+            object_pk__in=models.Subquery(
+                sessions.annotate(
+                    object_pk=models.functions.Cast("pk", models.CharField())
+                ).values("object_pk")
+            ),
+        ).delete()
+    sessions.delete()
+
+
+def restore_self_sessions(apps, schema_editor):
+    Session = apps.get_model("scheduler", "Session")
+    Unavailability = apps.get_model("scheduler", "Unavailability")
+    Session.objects.bulk_create(
+        [
+            Session(
+                student_id=block.teacher_id,
+                teacher_id=block.teacher_id,
+                date=block.date,
+                timeblock=timeblock,
+                location="onsite",
+            )
+            for block in Unavailability.objects.iterator()
+            for timeblock in TIMEBLOCKS[
+                TIMEBLOCKS.index(block.start_timeblock) : TIMEBLOCKS.index(
+                    block.end_timeblock
+                )
+                + 1
+            ]
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("guardian", "0002_generic_permissions_index"),
+        ("scheduler", "0004_session_slot_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Unavailability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "start_timeblock",
+                    models.CharField(
+                        choices=[
+                            ("A", "8:30-9:00"),
+                            ("B", "9:00-9:30"),
+                            ("C", "9:30-10:00"),
+                            ("D", "10:00-10:30"),
+                            ("E", "10:30-11:00"),
+                            ("F", "11:00-11:30"),
+                            ("G", "11:30-12:00"),
+                            ("H", "12:00-12:30"),
+                            ("I", "12:30-13:00"),
+                            ("J", "13:00-13:30"),
+                            ("K", "13:30-14:00"),
+                            ("L", "14:00-14:30"),
+                            ("M", "14:30-15:00"),
+                            ("N", "15:00-15:30"),
+                            ("O", "15:30-16:00"),
+                            ("P", "16:00-16:30"),
+                        ],
+                        default="A",
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "end_timeblock",
+                    models.CharField(
+                        choices=[
+                            ("A", "8:30-9:00"),
+                            ("B", "9:00-9:30"),
+                            ("C", "9:30-10:00"),
+                            ("D", "10:00-10:30"),
+                            ("E", "10:30-11:00"),
+                            ("F", "11:00-11:30"),
+                            ("G", "11:30-12:00"),
+                            ("H", "12:00-12:30"),
+                            ("I", "12:30-13:00"),
+                            ("J", "13:00-13:30"),
+                            ("K", "13:30-14:00"),
+                            ("L", "14:00-14:30"),
+                            ("M", "14:30-15:00"),
+                            ("N", "15:00-15:30"),
+                            ("O", "15:30-16:00"),
+                            ("P", "16:00-16:30"),
+                        ],
+                        default="P",
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "date_posted",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="unavailability",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Unavailability",
+                "verbose_name_plural": "Unavailabilities",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="unavailability",
+            index=models.Index(
+                fields=["teacher", "date"], name="unavailability_day_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="unavailability",
+            constraint=models.CheckConstraint(
+                check=models.Q(("start_timeblock__lte", models.F("end_timeblock"))),
+                name="unavailability_timeblock_order",
+            ),
+        ),
+        migrations.RunPython(move_self_sessions, restore_self_sessions),
+    ]
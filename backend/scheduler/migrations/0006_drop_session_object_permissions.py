@@ -0,0 +1,62 @@
+from django.db import migrations
+
+SESSION_PERMISSIONS = ("view_session", "change_session", "delete_session")
+
+
+def session_content_type(apps):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    return ContentType.objects.filter(app_label="scheduler", model="session").first()
+
+
+def drop_session_permissions(apps, schema_editor):
+    UserObjectPermission = apps.get_model("guardian", "UserObjectPermission")
+    GroupObjectPermission = apps.get_model("guardian", "GroupObjectPermission")
+    content_type = session_content_type(apps)
+    if content_type is None:
+        return
+    UserObjectPermission.objects.filter(content_type=content_type).delete()
+    GroupObjectPermission.objects.filter(content_type=content_type).delete()
+
+
+def restore_session_permissions(apps, schema_editor):
+    Permission = apps.get_model("auth", "Permission")
+    Session = apps.get_model("scheduler", "Session")
+    UserObjectPermission = apps.get_model("guardian", "UserObjectPermission")
+    content_type = session_content_type(apps)
+    if content_type is None:
+        return
+    permissions = list(
+        Permission.objects.filter(
+            content_type=content_type, codename__in=SESSION_PERMISSIONS
+        )
+    )
+    rows = []
+    for pk, student_id, teacher_id in Session.objects.values_list(
+        "pk", "student_id", "teacher_id"
+    ).iterator():
+        for user_id in {student_id, teacher_id}:
+            rows.extend(
+                UserObjectPermission(
+                    user_id=user_id,
+                    permission=permission,
+                    content_type=content_type,
+                    object_pk=str(pk),
+                )
+                for permission in permissions
+            )
+    UserObjectPermission.objects.bulk_create(
+        rows, batch_size=1000, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("guardian", "0002_generic_permissions_index"),
+        ("scheduler", "0005_unavailability"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_session_permissions, restore_session_permissions),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("scheduler", "0007_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="digest",
+            field=models.BooleanField(default=False),
+        ),
+    ]
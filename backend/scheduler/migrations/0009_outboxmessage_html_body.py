@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("scheduler", "0008_outboxmessage_digest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="html_body",
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.1.3 on 2026-10-18 12:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("scheduler", "0010_exportjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="exportjob",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="OutboxAttachment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255)),
+                ("content", models.BinaryField()),
+                ("mimetype", models.CharField(max_length=100)),
+                (
+                    "message",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attachments",
+                        to="scheduler.outboxmessage",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Outbox Attachment",
+                "verbose_name_plural": "Outbox Attachments",
+            },
+        ),
+    ]
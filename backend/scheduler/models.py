@@ -1,25 +1,86 @@
 from __future__ import annotations
 
+import bisect
+import contextlib
+import datetime
+import functools
+import operator
+from contextvars import ContextVar
 from datetime import date
 from typing import TYPE_CHECKING, cast
 
+from django.conf import settings
 from django.contrib import auth
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 if TYPE_CHECKING:
-    from typing import Type
+    from typing import Iterable, Iterator, Optional, Type
 
     from django.contrib.auth.models import AbstractUser
+    from scheduler.notifications import Notification
 
 User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
 
 
-class Session(models.Model):
+class OccupancyMixin:
+    OCCUPANCY_FIELDS: tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)  # type: ignore
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def occupancy_keys(self):
+        keys = set()
+        day_field = self._meta.get_field("date")  # type: ignore
+        for values in (
+            {field: getattr(self, field) for field in ("date", *self.OCCUPANCY_FIELDS)},
+            getattr(self, "_loaded_values", {}),
+        ):
+            if values.get("date") is None:
+                continue
+            day = day_field.to_python(values["date"])
+            for field in self.OCCUPANCY_FIELDS:
+                if values.get(field) is not None:
+                    keys.add((values[field], day))
+        return keys
+
+
+class SessionQuerySet(models.QuerySet):
+    def visible_to(self, user: AbstractUser):
+        return self.filter(Q(student=user) | Q(teacher=user))
+
+    def with_participants(self):
+        return self.select_related("student__profile", "teacher__profile")
+
+    def upcoming(self, today: Optional[date] = None):
+        return self.filter(date__gte=today or timezone.localdate()).order_by(
+            "date", "timeblock", "pk"
+        )
+
+    def past(self, today: Optional[date] = None):
+        return self.filter(date__lt=today or timezone.localdate()).order_by(
+            "-date", "-timeblock", "-pk"
+        )
+
+    def after(self, day: date, timeblock: str, pk: int, descending: bool = False):
+        # Seeks past (date, timeblock, pk) in listing order, which the
+        # per-participant slot constraints can serve from their indexes.
+        lookup = "lt" if descending else "gt"
+        return self.filter(
+            Q(**{f"date__{lookup}": day})
+            | Q(date=day, **{f"timeblock__{lookup}": timeblock})
+            | Q(date=day, timeblock=timeblock, **{f"pk__{lookup}": pk})
+        )
+
+
+class Session(OccupancyMixin, models.Model):
     TIMEBLOCK_CHOICES = (
         ("A", "8:30-9:00"),
         ("B", "9:00-9:30"),
@@ -47,16 +108,21 @@ class Session(models.Model):
         ("onsite", "Onsite"),
         ("online", "Online"),
     )
+    SHARED_LOCATIONS = ("onsite", "online")
+    SLOT_TAKEN_MESSAGE = _("Oops, somebody has already booked at this slot.")
+    OCCUPANCY_FIELDS = ("student_id", "teacher_id")
 
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name="student_session",
+        db_index=False,
     )
     teacher = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name="teacher_session",
+        db_index=False,
     )
     date_posted = models.DateTimeField(default=timezone.now)
     date = models.DateField(default=timezone.now)
@@ -71,6 +137,21 @@ class Session(models.Model):
         default="onsite",
     )
 
+    objects = SessionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["teacher", "date", "timeblock"], name="unique_teacher_slot"
+            ),
+            models.UniqueConstraint(
+                fields=["student", "date", "timeblock"], name="unique_student_slot"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date", "timeblock"], name="session_date_slot_idx"),
+        ]
+
     @property
     def time(self):
         return dict(self.TIMEBLOCK_CHOICES)[self.timeblock]  # type: ignore
@@ -79,7 +160,7 @@ class Session(models.Model):
         if exclude is None:
             exclude = []
         if "teacher" not in exclude:
-            if not self.teacher.groups.filter(name="teacher").exists():
+            if not self.teacher.profile.is_teacher:
                 raise ValidationError(
                     _("Teacher is not actually a teacher."), code="invalid"
                 )
@@ -97,7 +178,7 @@ class Session(models.Model):
             "data" not in exclude
             and "timeblock" not in exclude
             and "location" not in exclude
-            and self.location not in ("onsite", "online")
+            and self.location not in self.SHARED_LOCATIONS
         ):
             if (
                 type(self)
@@ -110,30 +191,36 @@ class Session(models.Model):
             ):
                 raise ValidationError("Oops, the room is not avaliable.")
         if (
-            "data" not in exclude
+            "date" not in exclude
             and "timeblock" not in exclude
             and "teacher" not in exclude
             and "student" not in exclude
         ):
-            if (
-                type(self)
-                .objects.filter(
-                    Q(date=self.date)
-                    & Q(timeblock=self.timeblock)
-                    & (
-                        Q(teacher=self.teacher)
-                        | Q(teacher=self.student)
-                        | Q(student=self.teacher)
-                        | Q(student=self.student)
-                    )
+            if self.is_slot_taken(
+                SlotOccupancy.objects.filter(
+                    user_id__in=(self.teacher_id, self.student_id),  # type: ignore
+                    date=self.date,
                 )
-                .exists()
             ):
-                raise ValidationError("Oops, somebody has already booked at this slot.")
-        return super().validate_constraints(exclude=exclude)  # type: ignore
+                raise ValidationError(self.SLOT_TAKEN_MESSAGE, code="conflict")
+        # The slot constraints are covered by the occupancy check above and
+        # enforced by the database on insert, so skip their extra queries.
+        return super().validate_constraints(  # type: ignore
+            exclude={*exclude, "timeblock"}
+        )
+
+    def is_slot_taken(self, occupancies: Iterable[SlotOccupancy]):
+        occupied = 0
+        for occupancy in occupancies:
+            occupied |= occupancy.mask
+        return bool(occupied & TIME_GRID.bits.get(self.timeblock, 0))
 
     def is_upcoming(self):
-        return date.today() <= self.date
+        return timezone.localdate() <= self.date
+
+    @property
+    def starts_at(self):
+        return TIME_GRID.slot_bounds(self.date, self.timeblock)[0]
 
     @property
     def get_weekday(self):
@@ -146,6 +233,520 @@ class Session(models.Model):
         return reverse("session-detail", kwargs={"pk": self.pk})
 
 
+class TimeGrid:
+    def __init__(
+        self,
+        timeblocks: Iterable[tuple[str, str]],
+        teacher_timeblocks: Iterable[tuple[str, str, list[str]]],
+        tzinfo: Optional[datetime.tzinfo] = None,
+    ):
+        self.tzinfo = tzinfo or timezone.get_default_timezone()
+        self.timeblocks = tuple(timeblocks)
+        self.labels = dict(self.timeblocks)
+        self.bits: dict[str, int] = {}
+        self.bounds: dict[str, tuple[datetime.time, datetime.time]] = {}
+        self.spans: dict[str, tuple[int, int]] = {}
+        self.ranges: dict[str, tuple[str, str]] = {}
+        for i, (key, label) in enumerate(self.timeblocks):
+            start, end = (
+                datetime.time(*map(int, part.split(":")), tzinfo=self.tzinfo)
+                for part in label.split("-", maxsplit=1)
+            )
+            self.bits[key] = 1 << i
+            self.bounds[key] = (start, end)
+            self.spans[key] = (self.bits[key], self.bits[key])
+            self.ranges[key] = (key, key)
+        for key, _label, keys in teacher_timeblocks:
+            self.bits[key] = functools.reduce(operator.or_, map(self.bits.get, keys))
+            self.bounds[key] = (self.bounds[keys[0]][0], self.bounds[keys[-1]][1])
+            self.spans[key] = (self.bits[keys[0]], self.bits[keys[-1]])
+            self.ranges[key] = (keys[0], keys[-1])
+        self.full_mask = (1 << len(self.timeblocks)) - 1
+        self._starts = [
+            self._offset(self.bounds[key][0]) for key, _label in self.timeblocks
+        ]
+        self._ends = [
+            self._offset(self.bounds[key][1]) for key, _label in self.timeblocks
+        ]
+
+    @staticmethod
+    def _offset(value: datetime.time):
+        return datetime.timedelta(hours=value.hour, minutes=value.minute)
+
+    def midnight(self, day: datetime.date):
+        return datetime.datetime.combine(day, datetime.time(tzinfo=self.tzinfo))
+
+    def slot_bounds(self, day: datetime.date, key: str):
+        start, end = self.bounds[key]
+        return (
+            datetime.datetime.combine(day, start),
+            datetime.datetime.combine(day, end),
+        )
+
+    def past_mask(self, day: datetime.date, earliest: datetime.datetime):
+        count = bisect.bisect_right(self._starts, earliest - self.midnight(day))
+        return (1 << count) - 1
+
+    def future_mask(self, day: datetime.date, latest: Optional[datetime.datetime]):
+        if latest is None:
+            return 0
+        count = bisect.bisect_left(self._ends, latest - self.midnight(day))
+        return self.full_mask & ~((1 << count) - 1)
+
+    def span_mask(self, first: str, last: str):
+        return (self.bits[last] << 1) - self.bits[first]
+
+    def keys(self, mask: int):
+        return [key for key, _label in self.timeblocks if mask & self.bits[key]]
+
+    def is_closed(self, key: str, past: int, future: int):
+        first, last = self.spans[key]
+        return bool(past & first or future & last)
+
+
+TIME_GRID = TimeGrid(Session.TIMEBLOCK_CHOICES, Session.TEACHER_TIMEBLOCK)
+
+
+_deferred_keys: ContextVar[Optional[set[tuple[int, datetime.date]]]] = ContextVar(
+    "deferred_occupancy_keys", default=None
+)
+
+
+class SlotOccupancyManager(models.Manager):
+    MASK_FIELDS = ("teacher_mask", "student_mask", "blocked_mask")
+
+    @staticmethod
+    def collect_masks(
+        rows: Iterable[tuple[int, int, datetime.date, str]],
+        blocks: Iterable[tuple[int, datetime.date, str, str]] = (),
+    ):
+        masks: dict[tuple[int, datetime.date], list[int]] = {}
+        for student_id, teacher_id, day, timeblock in rows:
+            bit = TIME_GRID.bits.get(timeblock, 0)
+            if student_id == teacher_id:
+                masks.setdefault((student_id, day), [0, 0, 0])[2] |= bit
+            else:
+                masks.setdefault((teacher_id, day), [0, 0, 0])[0] |= bit
+                masks.setdefault((student_id, day), [0, 0, 0])[1] |= bit
+        for teacher_id, day, first, last in blocks:
+            masks.setdefault((teacher_id, day), [0, 0, 0])[2] |= TIME_GRID.span_mask(
+                first, last
+            )
+        return masks
+
+    def write_masks(self, masks: dict[tuple[int, datetime.date], list[int]]):
+        return self.bulk_create(
+            [
+                self.model(user_id=user_id, date=day, **dict(zip(self.MASK_FIELDS, m)))
+                for (user_id, day), m in masks.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user_id", "date"],
+            update_fields=list(self.MASK_FIELDS),
+        )
+
+    @staticmethod
+    def key_filter(keys: Iterable[tuple[int, datetime.date]]):
+        return functools.reduce(
+            operator.or_, (Q(user_id=user_id, date=day) for user_id, day in keys)
+        )
+
+    def lock(self, keys: Iterable[tuple[int, datetime.date]], create: bool = True):
+        # Rows are created up front so there is always something to lock, and
+        # locked in a stable order so concurrent writers cannot deadlock.
+        keys = sorted(set(keys))
+        if not keys:
+            return []
+        if create:
+            self.bulk_create(
+                [self.model(user_id=user_id, date=day) for user_id, day in keys],
+                ignore_conflicts=True,
+            )
+        return list(
+            self.select_for_update()
+            .filter(self.key_filter(keys))
+            .order_by("user_id", "date")
+        )
+
+    @contextlib.contextmanager
+    def deferred(self) -> Iterator[None]:
+        # Collects the keys refreshed inside the block and refreshes them once
+        # on the way out, so bulk writes cost one refresh instead of one per row.
+        if _deferred_keys.get() is not None:
+            yield
+            return
+        keys: set[tuple[int, datetime.date]] = set()
+        token = _deferred_keys.set(keys)
+        try:
+            yield
+        finally:
+            _deferred_keys.reset(token)
+        self.refresh(keys)
+
+    def refresh(self, keys: Iterable[tuple[int, datetime.date]]):
+        pending = _deferred_keys.get()
+        if pending is not None:
+            pending.update(keys)
+            return
+        keys = set(keys)
+        if not keys:
+            return
+        user_ids = {user_id for user_id, _day in keys}
+        days = {day for _user_id, day in keys}
+        with transaction.atomic(savepoint=False):
+            self.lock(keys, create=False)
+            rows = (
+                Session.objects.filter(date__in=days)
+                .filter(Q(student_id__in=user_ids) | Q(teacher_id__in=user_ids))
+                .values_list("student_id", "teacher_id", "date", "timeblock")
+            )
+            blocks = Unavailability.objects.filter(
+                date__in=days, teacher_id__in=user_ids
+            ).values_list("teacher_id", "date", "start_timeblock", "end_timeblock")
+            masks = self.collect_masks(rows, blocks)
+            self.write_masks({key: masks[key] for key in keys if key in masks})
+            # Free days are stored as missing rows; this also keeps the
+            # refresh from recreating rows for users that are being deleted.
+            free = [key for key in keys if key not in masks]
+            if free:
+                self.filter(self.key_filter(free)).delete()
+
+    def rebuild(self, batch_size: int = 1000):
+        rows = Session.objects.values_list(
+            "student_id", "teacher_id", "date", "timeblock"
+        ).iterator(chunk_size=batch_size)
+        blocks = Unavailability.objects.values_list(
+            "teacher_id", "date", "start_timeblock", "end_timeblock"
+        ).iterator(chunk_size=batch_size)
+        masks = list(self.collect_masks(rows, blocks).items())
+        self.all().delete()
+        for i in range(0, len(masks), batch_size):
+            self.write_masks(dict(masks[i : i + batch_size]))
+        return len(masks)
+
+    def for_users(self, user_ids: Iterable[int], start: date, end: date):
+        return {
+            (occupancy.user_id, occupancy.date): occupancy
+            for occupancy in self.filter(user_id__in=user_ids, date__range=(start, end))
+        }
+
+
+class SlotOccupancy(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="slot_occupancy",
+    )
+    date = models.DateField()
+    teacher_mask = models.IntegerField(default=0)
+    student_mask = models.IntegerField(default=0)
+    blocked_mask = models.IntegerField(default=0)
+
+    objects = SlotOccupancyManager()
+
+    class Meta:
+        verbose_name = "Slot Occupancy"
+        verbose_name_plural = "Slot Occupancies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date"], name="unique_slot_occupancy"
+            ),
+        ]
+
+    @property
+    def mask(self):
+        return self.teacher_mask | self.student_mask | self.blocked_mask
+
+
+class Unavailability(OccupancyMixin, models.Model):
+    OCCUPANCY_FIELDS = ("teacher_id",)
+
+    teacher = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="unavailability",
+        db_index=False,
+    )
+    date = models.DateField()
+    start_timeblock = models.CharField(
+        max_length=1,
+        choices=Session.TIMEBLOCK_CHOICES,
+        default="A",
+    )
+    end_timeblock = models.CharField(
+        max_length=1,
+        choices=Session.TIMEBLOCK_CHOICES,
+        default="P",
+    )
+    date_posted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Unavailability"
+        verbose_name_plural = "Unavailabilities"
+        constraints = [
+            models.CheckConstraint(
+                check=Q(start_timeblock__lte=models.F("end_timeblock")),
+                name="unavailability_timeblock_order",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["teacher", "date"], name="unavailability_day_idx"),
+        ]
+
+    @property
+    def mask(self):
+        return TIME_GRID.span_mask(self.start_timeblock, self.end_timeblock)
+
+    @property
+    def timeblocks(self):
+        return TIME_GRID.keys(self.mask)
+
+    @property
+    def time(self):
+        return (
+            f"{TIME_GRID.labels[self.start_timeblock].split('-')[0]}"
+            f"-{TIME_GRID.labels[self.end_timeblock].split('-')[1]}"
+        )
+
+    def __str__(self) -> str:
+        return f"{self.date} {self.time} ({self.teacher.profile.name})"  # type: ignore
+
+
+class OutboxMessageManager(models.Manager):
+    def build(
+        self,
+        subject: str,
+        body: str,
+        from_email: Optional[str],
+        recipients: list[str],
+        urgent: bool = False,
+        html_body: str = "",
+    ):
+        # Outside the digest window a notice goes out as one message to all
+        # recipients; inside it, each recipient gets a row of their own that
+        # the worker folds into a single digest when the window closes.
+        window = settings.NOTIFICATION_DIGEST_WINDOW
+        if urgent or not window:
+            return [
+                self.model(
+                    subject=subject,
+                    body=body,
+                    html_body=html_body,
+                    from_email=from_email or "",
+                    recipients=list(recipients),
+                )
+            ]
+        now = timezone.now()
+        send_after = now + datetime.timedelta(seconds=window - now.timestamp() % window)
+        return [
+            self.model(
+                subject=subject,
+                body=body,
+                html_body=html_body,
+                from_email=from_email or "",
+                recipients=[recipient],
+                digest=True,
+                send_after=send_after,
+            )
+            for recipient in dict.fromkeys(recipients)
+        ]
+
+    def enqueue(
+        self,
+        subject: str,
+        body: str,
+        from_email: Optional[str],
+        recipients: list[str],
+        urgent: bool = False,
+        html_body: str = "",
+    ):
+        return self.bulk_create(
+            self.build(subject, body, from_email, recipients, urgent, html_body)
+        )
+
+    def enqueue_many(self, messages: Iterable[Notification]):
+        return self.bulk_create(
+            [instance for message in messages for instance in self.build(*message)]
+        )
+
+    def claim(self, batch_size: int, lease: datetime.timedelta):
+        # Claimed rows are pushed past the lease so other workers skip them,
+        # and come back on their own if this worker dies mid-batch.
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(
+                self.select_for_update(skip_locked=True)
+                .filter(status=OutboxMessage.PENDING, send_after__lte=now)
+                .order_by("send_after", "pk")[:batch_size]
+            )
+            # A digest has to carry every due row of its recipient, not just
+            # the ones that happened to fit in this batch.
+            digests = Q()
+            for from_email, *recipients in {
+                (message.from_email, *message.recipients)
+                for message in messages
+                if message.digest
+            }:
+                digests |= Q(from_email=from_email, recipients=recipients)
+            if digests:
+                messages += (
+                    self.select_for_update(skip_locked=True)
+                    .filter(digests, status=OutboxMessage.PENDING, digest=True)
+                    .filter(send_after__lte=now)
+                    .exclude(pk__in=[message.pk for message in messages])
+                    .order_by("send_after", "pk")
+                )
+            self.filter(pk__in=[message.pk for message in messages]).update(
+                send_after=now + lease
+            )
+        return messages
+
+    def mark_sent(self, messages: list[OutboxMessage]):
+        return self.filter(pk__in=[message.pk for message in messages]).update(
+            status=OutboxMessage.SENT,
+            sent_at=timezone.now(),
+            attempts=models.F("attempts") + 1,
+            last_error="",
+        )
+
+    def mark_failed(
+        self,
+        message: OutboxMessage,
+        error: Exception,
+        max_attempts: int,
+        retry_delay: datetime.timedelta,
+        max_retry_delay: datetime.timedelta,
+    ):
+        message.attempts += 1
+        message.last_error = f"{type(error).__name__}: {error}"
+        if message.attempts >= max_attempts:
+            message.status = OutboxMessage.FAILED
+        else:
+            message.send_after = timezone.now() + min(
+                retry_delay * 2 ** (message.attempts - 1), max_retry_delay
+            )
+        message.save(update_fields=["status", "send_after", "attempts", "last_error"])
+
+
+class OutboxMessage(models.Model):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+    digest = models.BooleanField(default=False)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    date_created = models.DateTimeField(default=timezone.now)
+    send_after = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxMessageManager()
+
+    class Meta:
+        verbose_name = "Outbox Message"
+        verbose_name_plural = "Outbox Messages"
+        indexes = [
+            models.Index(fields=["status", "send_after"], name="outbox_queue_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.subject} ({', '.join(self.recipients)})"
+
+
+class OutboxAttachment(models.Model):
+    message = models.ForeignKey(
+        OutboxMessage,
+        on_delete=models.CASCADE,
+        related_name="attachments",
+    )
+    filename = models.CharField(max_length=255)
+    content = models.BinaryField()
+    mimetype = models.CharField(max_length=100)
+
+    class Meta:
+        verbose_name = "Outbox Attachment"
+        verbose_name_plural = "Outbox Attachments"
+
+    def __str__(self) -> str:
+        return self.filename
+
+
+class ExportJobManager(models.Manager):
+    def claim(self, lease: datetime.timedelta):
+        # A job still running after the lease was lost with its worker and is
+        # picked up again.
+        now = timezone.now()
+        with transaction.atomic():
+            job = (
+                self.select_for_update(skip_locked=True, of=("self",))
+                .select_related("user")
+                .filter(
+                    Q(status=ExportJob.PENDING)
+                    | Q(status=ExportJob.RUNNING, started_at__lt=now - lease)
+                )
+                .order_by("date_created", "pk")
+                .first()
+            )
+            if job is not None:
+                job.status = ExportJob.RUNNING
+                job.started_at = now
+                job.save(update_fields=["status", "started_at"])
+        return job
+
+
+class ExportJob(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="export_jobs",
+    )
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default=PENDING)
+    rows = models.PositiveIntegerField(default=0)
+    compressed = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    date_created = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ExportJobManager()
+
+    class Meta:
+        verbose_name = "Export Job"
+        verbose_name_plural = "Export Jobs"
+
+    def __str__(self) -> str:
+        return f"Export {self.pk} for {self.user} ({self.status})"
+
+    def get_absolute_url(self):
+        return reverse("teacher-export-status", kwargs={"pk": self.pk})
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+
 class TeacherSession(models.Model):
     student: models.ForeignKey = models.ForeignKey(
         User,
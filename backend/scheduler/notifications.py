@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import calendar
+import datetime
+import functools
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, loader
+from django.utils import timezone
+from scheduler.models import TIME_GRID
+
+if TYPE_CHECKING:
+    from typing import Any, Iterable, Optional
+
+    from django.contrib.auth.models import AbstractUser
+    from django.template.backends.django import Template
+    from scheduler.models import Session
+
+# calendar.month_name goes through strftime on every lookup, so read the
+# names once; they are the same ones strftime("%B") prints.
+MONTH_NAMES = tuple(calendar.month_name)
+MEET_URL = "https://meet.google.com/lookup/{}"
+
+
+class Notification(NamedTuple):
+    subject: str
+    body: str
+    from_email: Optional[str]
+    recipients: list[str]
+    urgent: bool = False
+    html_body: str = ""
+
+
+class Templates(NamedTuple):
+    subject: Template
+    text: Template
+    html: Optional[Template]
+
+
+def thai_date(day: datetime.date):
+    return f"วันที่ {day.day:02d} เดือน {MONTH_NAMES[day.month]} ปี {day.year}"
+
+
+def is_urgent(session: Session):
+    return session.starts_at - timezone.now() < datetime.timedelta(
+        seconds=settings.NOTIFICATION_URGENT_WITHIN
+    )
+
+
+def load_templates(name: str):
+    try:
+        html = loader.get_template(f"scheduler/email/{name}.html")
+    except TemplateDoesNotExist:
+        html = None
+    return Templates(
+        loader.get_template(f"scheduler/email/{name}_subject.txt"),
+        loader.get_template(f"scheduler/email/{name}.txt"),
+        html,
+    )
+
+
+cached_templates = functools.lru_cache(maxsize=None)(load_templates)
+
+
+def get_templates(name: str):
+    # Keep picking up template edits while developing.
+    if settings.DEBUG:
+        return load_templates(name)
+    return cached_templates(name)
+
+
+def session_context(session: Session):
+    return {
+        "student": session.student.username,
+        "teacher": session.teacher.username,
+        "date": thai_date(session.date),
+        "timeblock": TIME_GRID.labels[session.timeblock],
+        "location": session.location,
+        "meet_url": MEET_URL.format(session.teacher.username)
+        if session.location == "online"
+        else "",
+    }
+
+
+def render(name: str, sessions: Iterable[Session], **extra: Any):
+    templates = get_templates(name)
+    notifications = []
+    for session in sessions:
+        if session.student_id == session.teacher_id:  # type: ignore
+            continue
+        context = {**session_context(session), **extra}
+        notifications.append(
+            Notification(
+                "".join(templates.subject.render(context).splitlines()).strip(),
+                templates.text.render(context).strip(),
+                None,
+                [session.student.email, session.teacher.email],
+                is_urgent(session),
+                templates.html.render(context) if templates.html else "",
+            )
+        )
+    return notifications
+
+
+def session_created(session: Session, topic: Optional[str]):
+    return render("session_create", [session], topic=topic)
+
+
+def session_edited(session: Session):
+    return render("session_edit", [session])
+
+
+def sessions_cancelled(requested: AbstractUser, sessions: Iterable[Session]):
+    return render("session_cancel", sessions, requested=requested)
+
+
+def history_exported(user: AbstractUser):
+    templates = get_templates("history_export")
+    context = {"teacher": user.username}
+    # The export is what the user is waiting for, keep it out of the digest.
+    return Notification(
+        "".join(templates.subject.render(context).splitlines()).strip(),
+        templates.text.render(context).strip(),
+        None,
+        [user.email],
+        True,
+    )
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+from scheduler.models import TIME_GRID, Session
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+    from django.contrib.auth.models import AbstractUser
+
+SESSION_PAGE_SIZE = 20
+SESSION_ROLES = ("teacher", "student")
+SESSION_PERIODS = ("upcoming", "past")
+
+
+class SessionPage(NamedTuple):
+    sessions: list[Session]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(session: Session):
+    return f"{session.date.isoformat()}.{session.timeblock}.{session.pk}"
+
+
+def decode_cursor(value: str):
+    try:
+        day, timeblock, pk = value.split(".")
+        cursor = (datetime.date.fromisoformat(day), timeblock, int(pk))
+    except ValueError as error:
+        raise ValidationError(_("Invalid cursor."), code="invalid") from error
+    if timeblock not in TIME_GRID.labels:
+        raise ValidationError(_("Invalid cursor."), code="invalid")
+    return cursor
+
+
+def session_page(
+    user: AbstractUser,
+    role: str,
+    period: str,
+    cursor: Optional[str] = None,
+    today: Optional[datetime.date] = None,
+    size: int = SESSION_PAGE_SIZE,
+):
+    sessions = Session.objects.with_participants().filter(**{role: user})
+    descending = period == "past"
+    sessions = sessions.past(today) if descending else sessions.upcoming(today)
+    if cursor:
+        sessions = sessions.after(*decode_cursor(cursor), descending=descending)
+    # One extra row tells whether there is another page without a COUNT.
+    rows = list(sessions[: size + 1])
+    return SessionPage(
+        rows[:size], encode_cursor(rows[size - 1]) if len(rows) > size else None
+    )
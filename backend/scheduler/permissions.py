@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from guardian.utils import get_group_obj_perms_model, get_user_obj_perms_model
+
+
+def object_permission_models() -> tuple[type[models.Model], ...]:
+    return (get_user_obj_perms_model(), get_group_obj_perms_model())
+
+
+def find_orphan_permissions(model: type[models.Model], chunk_size: int = 1000):
+    # Yields the ids of orphaned permission rows one chunk at a time, so no
+    # query reads or locks more than a chunk's worth of rows.
+    for content_type in ContentType.objects.order_by("pk"):
+        target = content_type.model_class()
+        last = 0
+        while True:
+            rows = list(
+                model.objects.filter(  # type: ignore
+                    content_type=content_type, pk__gt=last
+                )
+                .order_by("pk")
+                .values_list("pk", "object_pk")[:chunk_size]
+            )
+            if not rows:
+                break
+            last = rows[-1][0]
+            existing: set[str] = set()
+            if target is not None:
+                object_pks = set()
+                for _pk, object_pk in rows:
+                    # A malformed object_pk cannot point at any object.
+                    try:
+                        object_pks.add(
+                            target._meta.pk.to_python(object_pk)  # type: ignore
+                        )
+                    except ValidationError:
+                        pass
+                existing = set(
+                    map(
+                        str,
+                        target._default_manager.filter(  # type: ignore
+                            pk__in=object_pks
+                        ).values_list("pk", flat=True),
+                    )
+                )
+            orphans = [pk for pk, object_pk in rows if object_pk not in existing]
+            if orphans:
+                yield orphans
+
+
+def table_size(model: type[models.Model]):
+    table = model._meta.db_table
+    size = None
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+            size = cursor.fetchone()[0]
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT data_length + index_length FROM information_schema.tables"
+                " WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+            row = cursor.fetchone()
+            size = row[0] if row else None
+    return model.objects.count(), size  # type: ignore
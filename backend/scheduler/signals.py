@@ -2,26 +2,44 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from guardian.shortcuts import assign_perm
-from scheduler.models import Session
+from scheduler.cache import bump_versions
+from scheduler.models import Session, SlotOccupancy, Unavailability
 
 if TYPE_CHECKING:
     from typing import Type
 
 
 @receiver(post_save, sender=Session)
-def session_permission(
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=Unavailability)
+@receiver(post_delete, sender=Unavailability)
+def session_occupancy(
+    sender: Type[Session | Unavailability],
+    instance: Session | Unavailability,
+    **kwargs,
+):  # pylint: disable=W0613
+    SlotOccupancy.objects.refresh(instance.occupancy_keys())
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=Unavailability)
+@receiver(post_delete, sender=Unavailability)
+def session_versions(
+    sender: Type[Session | Unavailability],
+    instance: Session | Unavailability,
+    **kwargs,
+):  # pylint: disable=W0613
+    bump_versions("user", (user_id for user_id, _day in instance.occupancy_keys()))
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def session_fragment_versions(
     sender: Type[Session],
     instance: Session,
-    created: bool,
     **kwargs,
 ):  # pylint: disable=W0613
-    if created:
-        assign_perm("scheduler.change_session", instance.student, instance)
-        assign_perm("scheduler.delete_session", instance.student, instance)
-        assign_perm("scheduler.view_session", instance.student, instance)
-        assign_perm("scheduler.change_session", instance.teacher, instance)
-        assign_perm("scheduler.delete_session", instance.teacher, instance)
-        assign_perm("scheduler.view_session", instance.teacher, instance)
+    bump_versions("session", (instance.pk,))
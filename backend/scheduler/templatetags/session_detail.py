@@ -1,29 +1,49 @@
 from __future__ import annotations
 
+import hashlib
 from typing import TYPE_CHECKING
 
 from django import template
+from django.template.loader import render_to_string
+from scheduler.cache import get_fragment, get_many_versions
 
 if TYPE_CHECKING:
-    from typing import Any, Literal
+    from typing import Literal
 
     from scheduler.models import Session
 
 register = template.Library()
 
 
-@register.inclusion_tag(
-    "scheduler/session_detail.html",
-    name="session_detail",
-    takes_context=True,
-)
-def session_detail(
-    context: dict[str, Any],
-    session: Session,
+@register.simple_tag(name="session_cards")
+def session_cards(
+    sessions: list[Session],
     mode: Literal["teacher", "student"] = "student",
 ):
-    return {
-        "session": session,
-        "user": context["user"],
-        "mode": mode,
-    }
+    # A page of cards is one fragment, so it costs the same cache round trips
+    # however many sessions it shows. Teacher cards show the student, student
+    # cards show the teacher.
+    if not sessions:
+        return ""
+    others = [
+        session.student_id if mode == "teacher" else session.teacher_id
+        for session in sessions
+    ]
+    versions = get_many_versions(
+        {"session": [session.pk for session in sessions], "profile": others}
+    )
+    parts = ":".join(
+        f"{session.pk}.{session.is_upcoming():d}"
+        f".{versions['session'][session.pk]}.{versions['profile'][other]}"
+        for session, other in zip(sessions, others)
+    )
+    return get_fragment(
+        "session_cards",
+        (mode, hashlib.md5(parts.encode(), usedforsecurity=False).hexdigest()),
+        lambda: "".join(
+            render_to_string(
+                "scheduler/session_detail.html", {"session": session, "mode": mode}
+            )
+            for session in sessions
+        ),
+    )
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING, cast
+
+from django.contrib import auth
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from scheduler.booking import block_slots, book_session
+from scheduler.cache import bump_profiles, bump_versions
+from scheduler.models import TIME_GRID, Session, SlotOccupancy
+from scheduler.pagination import session_page
+from users.models import TEACHER_GROUP
+
+if TYPE_CHECKING:
+    from typing import Type
+
+    from django.contrib.auth.models import AbstractUser
+
+User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
+
+
+def next_weekday(days: int = 1):
+    day = timezone.localdate() + datetime.timedelta(days=days)
+    while day.weekday() > 4:
+        day += datetime.timedelta(days=1)
+    return day
+
+
+class SchedulerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user("teacher", "teacher@example.com")
+        cls.student = User.objects.create_user("student", "student@example.com")
+        Group.objects.get_or_create(name=TEACHER_GROUP)[0].user_set.add(cls.teacher)
+
+
+# The cache the project ships with, so the fragment and version round trips
+# count towards the budget.
+DATABASE_CACHES = {
+    "default": {"BACKEND": "main.cache.DatabaseCache", "LOCATION": "django_cache"}
+}
+
+
+@override_settings(CACHES=DATABASE_CACHES)
+class SessionQueryBudgetTests(SchedulerTestCase):
+    def create_sessions(self, size: int):
+        Session.objects.filter(teacher=self.teacher).delete()
+        timeblocks = [key for key, _label in TIME_GRID.timeblocks]
+        today = timezone.localdate()
+        Session.objects.bulk_create(
+            [
+                Session(
+                    student=self.student,
+                    teacher=self.teacher,
+                    date=today
+                    + datetime.timedelta(days=sign * (1 + i // len(timeblocks))),
+                    timeblock=timeblocks[i % len(timeblocks)],
+                    location="online",
+                )
+                for sign in (1, -1)
+                for i in range(size)
+            ]
+        )
+        # bulk_create skips the signals that give saved sessions a version.
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(
+                "session",
+                Session.objects.filter(teacher=self.teacher).values_list(
+                    "pk", flat=True
+                ),
+            )
+
+    def pages(self):
+        # Page from deep in the history when there is more than one page.
+        cursor = session_page(self.teacher, "teacher", "past").next_cursor
+        return {
+            "sessions (teacher)": (self.teacher, reverse("session-list")),
+            "sessions (student)": (self.student, reverse("session-list")),
+            "sessions more (teacher)": (
+                self.teacher,
+                reverse("session-list-more", args=["teacher", "past"])
+                + (f"?after={cursor}" if cursor else ""),
+            ),
+            "profile": (
+                self.student,
+                reverse("users:detail", args=[self.teacher.username]),
+            ),
+        }
+
+    def invalidate(self, user: AbstractUser):
+        # Bumping both profiles invalidates every card and profile fragment,
+        # so the next request renders and caches and the one after reads back.
+        self.client.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_profiles((self.teacher.pk, self.student.pk))
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        self.create_sessions(1)
+        budgets = {}
+        for page, (user, url) in self.pages().items():
+            self.invalidate(user)
+            for cache_pass in ("cold", "warm"):
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                budgets[page, cache_pass] = len(queries)
+        self.create_sessions(50)
+        for page, (user, url) in self.pages().items():
+            self.invalidate(user)
+            for cache_pass in ("cold", "warm"):
+                with self.subTest(page=page, cache_pass=cache_pass):
+                    with self.assertNumQueries(budgets[page, cache_pass]):
+                        self.client.get(url)
+
+
+class BookingTests(SchedulerTestCase):
+    def session(self, student: AbstractUser, timeblock: str = "A"):
+        return Session(
+            student=student,
+            teacher=self.teacher,
+            date=next_weekday(),
+            timeblock=timeblock,
+            location="online",
+        )
+
+    def test_booking_a_taken_slot_conflicts(self):
+        other = User.objects.create_user("other", "other@example.com")
+        book_session(self.session(self.student))
+        with self.assertRaises(ValidationError):
+            book_session(self.session(other))
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_occupancy_follows_sessions(self):
+        book_session(self.session(self.student, "A"))
+        book_session(self.session(self.student, "C"))
+        Session.objects.filter(timeblock="A").delete()
+        rows = Session.objects.values_list(
+            "student_id", "teacher_id", "date", "timeblock"
+        )
+        expected = SlotOccupancy.objects.collect_masks(rows)
+        stored = {
+            (occupancy.user_id, occupancy.date): [
+                occupancy.teacher_mask,
+                occupancy.student_mask,
+                occupancy.blocked_mask,
+            ]
+            for occupancy in SlotOccupancy.objects.all()
+            if occupancy.mask
+        }
+        self.assertEqual(stored, expected)
+
+
+@override_settings(CACHES=DATABASE_CACHES)
+class BlockSlotsQueryBudgetTests(SchedulerTestCase):
+    def block_day(self, days: int, size: int):
+        day = next_weekday(days)
+        students = [
+            User.objects.create_user(f"student{days}-{i}", f"{days}-{i}@example.com")
+            for i in range(size)
+        ]
+        for student, (timeblock, _label) in zip(students, TIME_GRID.timeblocks):
+            book_session(
+                Session(
+                    student=student,
+                    teacher=self.teacher,
+                    date=day,
+                    timeblock=timeblock,
+                    location="online",
+                )
+            )
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                displaced = block_slots(self.teacher.pk, day, "allday")
+        self.assertEqual(len(displaced), size)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_displaced_sessions(self):
+        self.assertEqual(self.block_day(1, 1), self.block_day(8, 6))
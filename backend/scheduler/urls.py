@@ -34,6 +34,21 @@ urlpatterns = [
         name="scheduler-book",
         view=views.book,
     ),
+    path(
+        "book/<int:teacher_pk>/availability",
+        name="scheduler-availability",
+        view=views.availability,
+    ),
+    path(
+        "book/next/",
+        name="scheduler-next",
+        view=views.next_available,
+    ),
+    path(
+        "book/next/availability",
+        name="scheduler-next-availability",
+        view=views.next_available_json,
+    ),
     path(
         "sessions/new/<int:teacher_pk>/<yyyy:date>/<str:timeblock>",
         name="session-create-spec",
@@ -54,14 +69,34 @@ urlpatterns = [
         view=views.sessions_list,
         name="session-list",
     ),
+    path(
+        "sessions/more/<str:role>/<str:period>/",
+        view=views.sessions_list_more,
+        name="session-list-more",
+    ),
+    path(
+        "sessions/export/",
+        view=views.session_export,
+        name="session-export",
+    ),
     path(
         "teacher/export/",
         view=views.Teacher.export,
         name="teacher-export-session",
     ),
+    path(
+        "teacher/export/<int:pk>/",
+        view=views.Teacher.export_status,
+        name="teacher-export-status",
+    ),
     path(
         "sessions/new/teacher/<int:teacher_pk>/<yyyy:date>/<str:timeblock>",
         view=views.Teacher.TeacherSessionCreateView.as_view(),
         name="teacher-session-create",
     ),
+    path(
+        "unavailability/<int:pk>/delete",
+        view=views.Teacher.UnavailabilityDeleteView.as_view(),
+        name="unavailability-delete",
+    ),
 ]
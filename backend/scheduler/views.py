@@ -1,213 +1,96 @@
 from __future__ import annotations
 
-import csv
 import datetime
-import io
 from typing import TYPE_CHECKING, cast
 
-from django.contrib import auth
+from django.contrib import auth, messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import ValidationError
-from django.core.mail import EmailMessage, send_mail
-from django.db.models import Q
-from django.shortcuts import redirect, render
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import CreateView, DeleteView, UpdateView
 from guardian.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from guardian.shortcuts import get_objects_for_user
 
+from scheduler import notifications
+from scheduler.availability import (
+    find_next_available,
+    get_week_data,
+    range_availability,
+    range_etag,
+    week_days,
+)
+from scheduler.booking import block_slots, book_session
+from scheduler.cache import DIRECTORY, get_fragment, get_versions, versions_shared
+from scheduler.exports import (
+    SESSION_EXPORT_FORMATS,
+    session_export_available,
+    session_export_filters,
+    session_export_stream,
+    start_history_export,
+)
 from scheduler.forms import SessionForm, TeacherSessionForm
-from scheduler.models import Session
+from scheduler.models import ExportJob, OutboxMessage, Session, Unavailability
+from scheduler.pagination import SESSION_PERIODS, SESSION_ROLES, session_page
 
 if TYPE_CHECKING:
-    from typing import Any, Optional, Type
+    from typing import Iterable, Optional, Type
 
     from django.contrib.auth.models import AbstractUser
 
 User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
 
-
-def generate_week_data(student: AbstractUser, teacher: AbstractUser, week: int = 0):
-    if not teacher:
-        return []
-    is_self = student.pk == teacher.pk
-    data_week = []
-    now = datetime.datetime.now()
-    earliest_book_time = (
-        now + datetime.timedelta(hours=1)
-        if is_self
-        else now + datetime.timedelta(hours=12)
-    )
-    latest_book_time = (
-        datetime.datetime.max if is_self else now + datetime.timedelta(weeks=1)
-    )
-    startday = now.date() + datetime.timedelta(
-        weeks=week + (1 if now.weekday() > 5 else 0), days=-now.weekday()
-    )
-    for i in range(5):
-        data_day: dict[str, Any] = {}
-        curr_day = startday + datetime.timedelta(days=i)
-        weekday = curr_day.strftime("%A").upper()
-        data_day["date"] = str(curr_day)
-        data_day["weekday"] = weekday
-        data_day["timeblocks"] = {}
-        for key, time in Session.TIMEBLOCK_CHOICES:
-            start_time = datetime.datetime.strptime(
-                curr_day.strftime("%d/%m/%Y") + " " + time.split("-", maxsplit=1)[0],
-                "%d/%m/%Y %H:%M",
-            )
-            end_time = datetime.datetime.strptime(
-                curr_day.strftime("%d/%m/%Y") + " " + time.split("-", maxsplit=1)[1],
-                "%d/%m/%Y %H:%M",
-            )
-            is_past = start_time <= earliest_book_time
-            is_future = latest_book_time <= end_time
-            try:
-                is_booked = Session.objects.get(
-                    Q(date=str(curr_day)) & Q(timeblock=key) & Q(student=student)
-                )
-            except Session.DoesNotExist:
-                is_booked = None
-            try:
-                is_full = Session.objects.get(
-                    Q(date=str(curr_day)) & Q(timeblock=key) & Q(teacher=teacher)
-                )
-            except Session.DoesNotExist:
-                is_full = None
-            data_day["timeblocks"][key] = {
-                "label": time,
-                "is_avaliable": not (is_past or is_future or is_booked or is_full),
-                "session": is_full if is_self else is_booked,
-            }
-        if is_self:
-            data_day["timeblocks_teacher"] = {}
-            timeblocks = dict(Session.TIMEBLOCK_CHOICES)
-            for key, text, time_keys in Session.TEACHER_TIMEBLOCK:
-                start_time = datetime.datetime.strptime(
-                    curr_day.strftime("%d/%m/%Y")
-                    + " "
-                    + timeblocks[time_keys[0]].split("-", maxsplit=1)[0],
-                    "%d/%m/%Y %H:%M",
-                )
-                end_time = datetime.datetime.strptime(
-                    curr_day.strftime("%d/%m/%Y")
-                    + " "
-                    + timeblocks[time_keys[-1]].split("-", maxsplit=1)[1],
-                    "%d/%m/%Y %H:%M",
-                )
-                is_past = start_time <= earliest_book_time
-                is_future = latest_book_time <= end_time
-                is_booked = Session.objects.filter(
-                    Q(date=str(curr_day))
-                    & Q(timeblock__in=time_keys)
-                    & Q(teacher=teacher)
-                    & ~Q(student=student)
-                ).exists()
-                data_day["timeblocks_teacher"][key] = {
-                    "label": text,
-                    "is_avaliable": not (is_past or is_future or is_booked),
-                }
-
-        data_week.append(data_day)
-    return data_week
+AVAILABILITY_DEFAULT_RANGE = datetime.timedelta(weeks=4, days=-1)
+AVAILABILITY_MAX_DAYS = 92
+NEXT_AVAILABLE_DEFAULT_RANGE = datetime.timedelta(weeks=1)
+NEXT_AVAILABLE_MAX_RESULTS = 50
 
 
 def send_session_create_mail(
     session: Session,
     topic: Optional[str],
 ):
-    if session.student != session.teacher:
-        date = (
-            session.date.strftime(
-                "วันที่ %d เดือน %B ปี %Y".encode("unicode-escape").decode()
-            )
-            .encode()
-            .decode("unicode-escape")
-        )
-        timeblock = dict(Session.TIMEBLOCK_CHOICES)[session.timeblock]  # type: ignore
-        meet_url = f"https://meet.google.com/lookup/{session.teacher.username}"
-        send_mail(
-            "จองเวลาคุยกับอาจารย์",
-            (
-                f"เรียนคุณ { session.student.username } และอาจารย์ { session.teacher.username }"
-                "\n\n"
-                f"เรามีนัดคุยกัน"
-                f'{f"ในหัวข้อ { topic } " if topic else ""}'
-                f"ใน { date } ช่วง { timeblock } "
-                f'{f"โปรดมาพบกันที่มีท {meet_url}" if session.location == "online" else ""}'
-                "\n\n"
-                "MVIS ยินดีอย่างยิ่งที่ได้รับใช้ท่าน"
-                "\n"
-                "อย่าลืมนัดนะง้าบบบ"
-            ),
-            None,
-            [session.student.email, session.teacher.email],
-        )
+    OutboxMessage.objects.enqueue_many(notifications.session_created(session, topic))
 
 
 def send_session_edit_mail(
     session: Session,
 ):
-    if session.student != session.teacher:
-        date = (
-            session.date.strftime(
-                "วันที่ %d เดือน %B ปี %Y".encode("unicode-escape").decode()
-            )
-            .encode()
-            .decode("unicode-escape")
-        )
-        timeblock = dict(Session.TIMEBLOCK_CHOICES)[session.timeblock]  # type: ignore
-        meet_url = f"https://meet.google.com/lookup/{session.teacher.username}"
-        send_mail(
-            "ขอยกเลิกนัด",
-            (
-                f"เรียนคุณ { session.student.username } และอาจารย์ { session.teacher.username }"
-                "\n\n"
-                "เราขอเปลี่ยนแปลงการนัด"
-                f"ใน { date } ช่วง { timeblock } "
-                f"ให้เป็นแบบ { session.location } "
-                f'{f"โปรดมาพบกันที่มีท {meet_url}" if session.location == "online" else ""}'
-                "\n\n"
-                "MVIS ยินดีอย่างยิ่งที่ได้รับใช้ท่าน"
-                "\n"
-                "อย่าลืมนัดนะง้าบบบ"
-            ),
-            None,
-            [session.student.email, session.teacher.email],
-        )
+    OutboxMessage.objects.enqueue_many(notifications.session_edited(session))
 
 
 def send_session_cancel_mail(
     requested: AbstractUser,
     session: Session,
 ):
-    if session.student != session.teacher:
-        date = (
-            session.date.strftime(
-                "วันที่ %d เดือน %B ปี %Y".encode("unicode-escape").decode()
-            )
-            .encode()
-            .decode("unicode-escape")
-        )
-        timeblock = dict(Session.TIMEBLOCK_CHOICES)[session.timeblock]  # type: ignore
-        send_mail(
-            "ขอยกเลิกนัด",
-            (
-                f"เรียนคุณ { session.student.username } และอาจารย์ { session.teacher.username }"
-                "\n\n"
-                "ขออภัยเป็นอย่างยิ่ง เราขอยกเลิกนัด"
-                f"ใน { date } ช่วง { timeblock } "
-                f"เนื่องจากคุณ { requested } ไม่สะดวก "
-                "กรุณานัดเวลาใหม่ในระบบอีกครั้ง"
-                "\n\n"
-                "MVIS ยินดีอย่างยิ่งที่ได้รับใช้ท่าน"
-                "\n"
-                "อย่าลืมนัดนะง้าบบบ"
-            ),
-            None,
-            [session.student.email, session.teacher.email],
-        )
+    send_session_cancel_mails(requested, [session])
+
+
+def send_session_cancel_mails(
+    requested: AbstractUser,
+    sessions: Iterable[Session],
+):
+    notices = notifications.sessions_cancelled(requested, sessions)
+    if notices:
+        OutboxMessage.objects.enqueue_many(notices)
 
 
 class SessionCreateView(LoginRequiredMixin, CreateView):
@@ -220,14 +103,22 @@ class SessionCreateView(LoginRequiredMixin, CreateView):
             "timeblock": self.kwargs.get("timeblock"),
             "teacher": User.objects.get(pk=self.kwargs.get("teacher_pk")),
             "student": self.request.user,
-            "location": self.kwargs.get("location"),
+            "location": self.kwargs.get("location", self.request.GET.get("location")),
             "topic": self.kwargs.get("topic"),
         }
 
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                self.object = book_session(form.save(commit=False))
+                send_session_create_mail(self.object, form.cleaned_data.get("topic"))
+        except ValidationError as error:
+            form.add_error(None, error)
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
     def get_success_url(self):
         user = cast("User", self.request.user)
-        session = cast("Session", self.object)  # type:ignore
-        send_session_create_mail(session, self.request.POST.get("topic"))
         return reverse("users:detail", args=[user.username])
 
 
@@ -242,11 +133,14 @@ class SessionEditView(
     permission_required = "scheduler.change_session"
     fields = ("location",)
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            send_session_edit_mail(self.object)
+        return response
+
     def get_success_url(self):
-        session_id = self.kwargs.get("pk")
-        session = Session.objects.get(id=session_id)
         user = cast("User", self.request.user)
-        send_session_edit_mail(session)
         return reverse("users:detail", args=[user.username])
 
 
@@ -254,11 +148,13 @@ class SessionCancelView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView)
     model = Session
     permission_required = "scheduler.delete_session"
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            send_session_cancel_mail(self.request.user, self.object)
+            return super().form_valid(form)
+
     def get_success_url(self):
-        session_id = self.kwargs.get("pk")
-        session = Session.objects.get(id=session_id)
         user = cast("User", self.request.user)
-        send_session_cancel_mail(user, session)
         return reverse("users:detail", args=[user.username])
 
 
@@ -266,13 +162,13 @@ def book(request, teacher_pk, week=0):
     if not request.user.is_authenticated:
         return redirect("/accounts/login/")
     student = request.user
-    teacher = User.objects.get(pk=teacher_pk)
+    teacher = User.objects.select_related("profile").get(pk=teacher_pk)
     if not teacher:
         raise ValidationError(_("Teacher does not exist."), code="invalid")
-    if not teacher.groups.filter(name="teacher"):
+    if not teacher.profile.is_teacher:
         raise ValidationError(_("Teacher is not actually a teacher."), code="invalid")
     context = {
-        "week": generate_week_data(student, teacher, week),
+        "week": get_week_data(student, teacher, week),
         "teacher": teacher,
         "prev_week": week - 1,
         "next_week": week + 1,
@@ -280,23 +176,135 @@ def book(request, teacher_pk, week=0):
     return render(request, "scheduler/booking.html", context)
 
 
+def parse_date_range(
+    params,
+    default_start: datetime.date,
+    default_range: datetime.timedelta = AVAILABILITY_DEFAULT_RANGE,
+):
+    try:
+        start = datetime.date.fromisoformat(params.get("start", str(default_start)))
+        end = datetime.date.fromisoformat(params.get("end", str(start + default_range)))
+    except ValueError as error:
+        raise ValidationError(_("Invalid date."), code="invalid") from error
+    if end < start or (end - start).days >= AVAILABILITY_MAX_DAYS:
+        raise ValidationError(
+            _("Date range must span 1 to %(days)s days."),
+            code="invalid",
+            params={"days": AVAILABILITY_MAX_DAYS},
+        )
+    return start, end
+
+
+@login_required
+def availability(request, teacher_pk):
+    teacher = get_object_or_404(User, pk=teacher_pk, profile__is_teacher=True)
+    try:
+        start, end = parse_date_range(request.GET, week_days(timezone.localtime())[0])
+    except ValidationError as error:
+        return JsonResponse({"error": error.messages}, status=400)
+    etag = None
+    response = None
+    if versions_shared():
+        etag = quote_etag(range_etag(request.user, teacher, start, end))
+        response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(range_availability(request.user, teacher, start, end))
+    if etag:
+        response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def search_next_available(request):
+    start, end = parse_date_range(
+        request.GET, timezone.localdate(), NEXT_AVAILABLE_DEFAULT_RANGE
+    )
+    location = request.GET.get("location") or None
+    if location is not None and location not in dict(Session.LOCATION_CHOICES):
+        raise ValidationError(_("Unknown location."), code="invalid")
+    try:
+        limit = min(int(request.GET.get("limit", 10)), NEXT_AVAILABLE_MAX_RESULTS)
+    except ValueError as error:
+        raise ValidationError(_("Invalid limit."), code="invalid") from error
+    return location, find_next_available(
+        request.user, start, end, max(limit, 1), location
+    )
+
+
+@login_required
+def next_available(request):
+    try:
+        location, slots = search_next_available(request)
+    except ValidationError as error:
+        for message in error.messages:
+            messages.error(request, message)
+        location, slots = None, []
+    context = {
+        "slots": slots,
+        "location": location,
+        "locations": Session.LOCATION_CHOICES,
+    }
+    return render(request, "scheduler/next_available.html", context)
+
+
+@login_required
+def next_available_json(request):
+    try:
+        location, slots = search_next_available(request)
+    except ValidationError as error:
+        return JsonResponse({"error": error.messages}, status=400)
+    return JsonResponse(
+        {
+            "location": location,
+            "slots": [
+                {
+                    "date": str(slot["date"]),
+                    "timeblock": slot["timeblock"],
+                    "label": slot["label"],
+                    "teacher": slot["teacher"].pk,
+                    "teacher_name": slot["teacher"].profile.name,
+                }
+                for slot in slots
+            ],
+        }
+    )
+
+
 def sessions_list(request):
-    profile = request.user.profile
     user = request.user
-    sessions = get_objects_for_user(
-        user, "scheduler.view_session", with_superuser=False
-    )
+    today = timezone.localdate()
+    is_teacher = user.profile.is_teacher
     context = {
         "user": user,
-        "teacher_sessions": sessions.filter(teacher=profile.user),
-        "student_sessions": sessions.filter(student=profile.user),
-        "sessions": sessions,
+        "is_teacher": is_teacher,
+        "pages": {
+            f"{role}_{period}": session_page(user, role, period, today=today)
+            for role in SESSION_ROLES
+            for period in SESSION_PERIODS
+            if is_teacher or role != "teacher"
+        },
     }
     return render(request, "scheduler/sessions.html", context)
 
 
-def home(request):
-    teachers = User.objects.filter(groups__name="teacher")
+@login_required
+def sessions_list_more(request, role, period):
+    if role not in SESSION_ROLES or period not in SESSION_PERIODS:
+        raise Http404
+    try:
+        page = session_page(request.user, role, period, request.GET.get("after"))
+    except ValidationError as error:
+        return JsonResponse({"error": error.messages}, status=400)
+    return render(
+        request,
+        "scheduler/session_page.html",
+        {"page": page, "role": role, "period": period},
+    )
+
+
+def teacher_directory():
+    teachers = User.objects.filter(profile__is_teacher=True).select_related("profile")
     context = {
         "teachers": [
             {
@@ -306,48 +314,59 @@ def home(request):
             for teacher in teachers
         ]
     }
+    return render_to_string("scheduler/teacher_list.html", context)
+
+
+def home(request):
+    context = {
+        "directory": get_fragment(
+            "directory",
+            get_versions("directory", (DIRECTORY,)).values(),
+            teacher_directory,
+        )
+    }
     return render(request, "scheduler/teachers.html", context)
 
 
+@staff_member_required
+def session_export(request):
+    format_ = request.GET.get("format", "csv")
+    if not session_export_available(format_):
+        return JsonResponse({"error": ["Unsupported format."]}, status=400)
+    try:
+        filters = session_export_filters(
+            request.GET.get("start"),
+            request.GET.get("end"),
+            request.GET.get("teacher"),
+            request.GET.get("location"),
+        )
+    except ValidationError as error:
+        return JsonResponse({"error": error.messages}, status=400)
+    content_type, extension = SESSION_EXPORT_FORMATS[format_]
+    response = StreamingHttpResponse(
+        session_export_stream(format_, filters), content_type=content_type
+    )
+    response[
+        "Content-Disposition"
+    ] = f'attachment; filename="sessions-{timezone.localdate():%Y%m%d}.{extension}"'
+    return response
+
+
 class Teacher:
     @classmethod
+    @method_decorator(login_required)
     def export(cls, request):
-        user = request.user
-        sessions = get_objects_for_user(
-            user, "scheduler.view_session", with_superuser=False
-        ).filter(teacher=user, date__lt=datetime.date.today())
-        content = (
-            f"เรียนอาจารย์ { user.username }"
-            "\n\n"
-            f"ตามที่ท่านได้ขอข้อมูลการจองในอดีตไว้ เราขอส่งข้อมูลนั้นให้กับท่าน"
-            "\n\n"
-            "MVIS ยินดีอย่างยิ่งที่ได้รับใช้ท่าน"
-            "\n"
-            "อย่าลืมนัดนะง้าบบบ"
+        job = start_history_export(request.user)
+        messages.info(
+            request, "Your past sessions are being exported, we will email them soon."
         )
-        email = EmailMessage(
-            "สรุปข้อมูล",
-            content,
-            None,
-            [user.email],
-        )
-        csvfile = io.StringIO()
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(["student", "teacher", "date", "timeblock", "location"])
-        for session in sessions:
-            print(session.is_upcoming())
-            csvwriter.writerow(
-                [
-                    session.student.username,
-                    session.teacher.username,
-                    session.date.strftime("%d/%m/%Y"),
-                    dict(Session.TIMEBLOCK_CHOICES)[session.timeblock],
-                    session.location,
-                ]
-            )
-        email.attach("data.csv", csvfile.getvalue(), "text/csv")
-        email.send()
-        return redirect("/")
+        return redirect(job)
+
+    @classmethod
+    @method_decorator(login_required)
+    def export_status(cls, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+        return render(request, "scheduler/export_job.html", {"job": job})
 
     class TeacherSessionCreateView(LoginRequiredMixin, CreateView):
         form_class = TeacherSessionForm
@@ -362,31 +381,25 @@ class Teacher:
             }
 
         def get_success_url(self):
-            teacher_id = self.kwargs.get("teacher_pk")
             user = cast("AbstractUser", self.request.user)
-            day = self.kwargs.get("date")
-            time_list = {
-                "allday": [chr(i) for i in range(65, 81)],
-                "allam": [chr(i) for i in range(65, 72)],
-                "allpm": [chr(i) for i in range(74, 81)],
-            }[self.kwargs.get("timeblock")]
-            sessions = Session.objects.filter(
-                date=day,
-                teacher_id=teacher_id,
-                timeblock__in=time_list,
-            )
-            for session in sessions:
-                send_session_cancel_mail(user, session)
-            sessions.delete()
-
-            for timeblock in time_list:
-                session = Session(
-                    student_id=teacher_id,
-                    teacher_id=teacher_id,
-                    date=day,
-                    timeblock=timeblock,
-                    location="onsite",
+            return reverse("users:detail", args=[user.username])
+
+        def form_valid(self, form):
+            with transaction.atomic():
+                self.object = form.save()
+                displaced = block_slots(
+                    self.kwargs.get("teacher_pk"),
+                    self.kwargs.get("date"),
+                    self.kwargs.get("timeblock"),
                 )
-                session.save()
+                send_session_cancel_mails(self.request.user, displaced)
+            return HttpResponseRedirect(self.get_success_url())
 
-            return reverse("users:detail", args=[user.username])
+    class UnavailabilityDeleteView(LoginRequiredMixin, DeleteView):
+        model = Unavailability
+
+        def get_queryset(self):
+            return Unavailability.objects.filter(teacher=self.request.user)
+
+        def get_success_url(self):
+            return reverse("scheduler-book", args=[self.request.user.pk])
@@ -6,8 +6,9 @@ from django.contrib import admin, auth
 from django.contrib.auth.admin import UserAdmin as _UserAdmin
 from django.contrib.auth.models import Group
 from django.utils.translation import gettext_lazy as _
+from scheduler.cache import bump_profiles
 from users.forms import ProfileChangeForm, UserChangeForm, UserCreationForm
-from users.models import Profile
+from users.models import TEACHER_GROUP, Profile
 
 if TYPE_CHECKING:
     from typing import Type
@@ -31,7 +32,8 @@ admin.site.unregister(User)
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     form = ProfileChangeForm
-    list_display = ["name", "user"]
+    list_display = ["name", "user", "is_teacher"]
+    list_filter = ["is_teacher"]
 
 
 @admin.register(User)
@@ -65,6 +67,9 @@ class UserAdmin(_UserAdmin):
 
     @admin.action(description="Set user as teacher")
     def make_teacher(self, request: HttpRequest, queryset: QuerySet[AbstractUser]):
-        teacher, _ = Group.objects.get_or_create(name="teacher")
+        teacher, _ = Group.objects.get_or_create(name=TEACHER_GROUP)
         teachers: RelatedManager[AbstractUser] = teacher.user_set  # type: ignore
         teachers.add(*queryset)
+        # add() only reports users that were not members yet.
+        Profile.objects.filter(user__in=queryset).update(is_teacher=True)
+        bump_profiles(user.pk for user in queryset)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, cast
+
+from allauth.account.auth_backends import AuthenticationBackend
+from django.contrib import auth
+from django.contrib.auth.backends import ModelBackend
+
+if TYPE_CHECKING:
+    from typing import Type
+
+    from django.contrib.auth.models import AbstractUser
+
+User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
+
+
+class ProfileUserMixin:
+    def get_user(self, user_id):
+        # auth.get_user loads request.user through here, so join the profile
+        # that templates and views read on nearly every page.
+        user = (
+            User._default_manager.select_related("profile").filter(pk=user_id).first()
+        )
+        if user is None or not self.user_can_authenticate(user):  # type: ignore
+            return None
+        return user
+
+
+class ProfileModelBackend(ProfileUserMixin, ModelBackend):
+    pass
+
+
+class ProfileAuthenticationBackend(ProfileUserMixin, AuthenticationBackend):
+    pass
@@ -23,10 +23,13 @@ class SignupFormCustom(SignupForm):
     avatar = forms.ImageField(label=_("Profile Image"), required=False)
 
     def save(self, request):
+        # The account adapter already saves first_name and last_name.
         user = super().save(request)
-        user.first_name = self.cleaned_data.get("first_name")
-        user.last_name = self.cleaned_data.get("last_name")
-        user.profile.avatar = self.cleaned_data.get("avatar")
+        avatar = self.cleaned_data.get("avatar")
+        if avatar:
+            profile: Profile = user.profile
+            profile.avatar = avatar
+            profile.save(update_fields=["avatar"])
         return user
 
     def clean_avatar(self):
@@ -76,8 +79,7 @@ class ProfileChangeForm(forms.ModelForm):
         profile = super().save(*args, **kwargs)
         profile.user.first_name = self.cleaned_data.get("first_name")
         profile.user.last_name = self.cleaned_data.get("last_name")
-        profile.user.avatar = self.cleaned_data.get("avatar")
-        profile.user.save()
+        profile.user.save(update_fields=["first_name", "last_name"])
         return profile
 
     def clean_avatar(self):
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from users.models import Profile, build_avatar_variants
+
+
+class Command(BaseCommand):
+    help = "Build the resized copies of avatars that do not have them yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true")
+        parser.add_argument("--poll-interval", type=float, default=5)
+
+    def handle(self, *args, **kwargs):
+        # The profiles waiting for variants are the queue, so avatars uploaded
+        # while the worker was down are picked up when it starts again.
+        failed: set[str] = set()
+        while True:
+            name = (
+                Profile.objects.filter(avatar_variants=False)
+                .exclude(avatar="")
+                .exclude(avatar__in=failed)
+                .order_by("pk")
+                .values_list("avatar", flat=True)
+                .first()
+            )
+            if name is not None:
+                try:
+                    updated = build_avatar_variants(name)
+                except Exception as error:  # pylint: disable=W0703
+                    # Skipped until the next start, so one unreadable file
+                    # does not hold up the avatars queued behind it.
+                    failed.add(name)
+                    self.stderr.write(f"avatar {name} failed: {error}")
+                else:
+                    self.stdout.write(f"avatar {name} done for {updated} profiles")
+                continue
+            if kwargs["once"]:
+                break
+            time.sleep(kwargs["poll_interval"])
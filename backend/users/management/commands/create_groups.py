@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from django.contrib.auth.models import Group
 from django.core.management.base import BaseCommand
+from users.models import TEACHER_GROUP
 
 
 class Command(BaseCommand):
     help = "Initialize user group(s)"
 
     def handle(self, *args, **kwargs):
-        Group.objects.get_or_create(name="teacher")
+        Group.objects.get_or_create(name=TEACHER_GROUP)
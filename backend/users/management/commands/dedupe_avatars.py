@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import datetime
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from scheduler.cache import bump_profiles
+from users.models import (
+    Profile,
+    avatar_name,
+    avatar_variant_names,
+    build_avatar_variants,
+)
+
+AVATAR_DIR = "profile"
+VARIANT_DIR = "profile/variants"
+
+
+class Command(BaseCommand):
+    help = (
+        "Rename avatars after their content, build missing variants and "
+        "delete duplicate files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **kwargs):
+        started = timezone.now()
+        dry_run = kwargs["dry_run"]
+        storage = Profile._meta.get_field("avatar").storage  # type: ignore
+        renames: dict[str, list[int]] = {}
+        missing: list[int] = []
+        kept: set[str] = set()
+        for pk, name in (
+            Profile.objects.exclude(avatar="")
+            .values_list("pk", "avatar")
+            .order_by("pk")
+            .iterator()
+        ):
+            if not storage.exists(name):
+                missing.append(pk)
+                continue
+            with storage.open(name, "rb") as file:
+                content = file.read()
+            target = avatar_name(content)
+            kept.add(target)
+            if target == name:
+                continue
+            if not dry_run and not storage.exists(target):
+                storage.save(target, ContentFile(content))
+            renames.setdefault(target, []).append(pk)
+        if not dry_run:
+            for target, pks in renames.items():
+                Profile.objects.filter(pk__in=pks).update(
+                    avatar=target, avatar_variants=False
+                )
+            # Profiles whose file is gone fall back to the bundled default.
+            Profile.objects.filter(pk__in=missing).update(avatar="")
+            bump_profiles(
+                Profile.objects.filter(
+                    pk__in=[pk for pks in renames.values() for pk in pks] + missing
+                ).values_list("user_id", flat=True)
+            )
+        unbuilt = kept & set(
+            Profile.objects.filter(avatar_variants=False).values_list(
+                "avatar", flat=True
+            )
+        )
+        if dry_run:
+            # Renamed profiles lose their variants until they are rebuilt.
+            unbuilt |= set(renames)
+        else:
+            for name in unbuilt:
+                build_avatar_variants(name)
+        variants = {variant for name in kept for variant in avatar_variant_names(name)}
+        orphans = [
+            f"{directory}/{filename}"
+            for directory, expected in ((AVATAR_DIR, kept), (VARIANT_DIR, variants))
+            if storage.exists(directory)
+            for filename in storage.listdir(directory)[1]
+            if f"{directory}/{filename}" not in expected
+        ]
+        deleted = freed = 0
+        for name in orphans:
+            if not dry_run and in_use(storage, name, started):
+                continue
+            freed += storage.size(name)
+            if not dry_run:
+                storage.delete(name)
+            deleted += 1
+        self.stdout.write(
+            f"profiles renamed: {sum(len(pks) for pks in renames.values())}\n"
+            f"distinct avatars: {len(kept)}\n"
+            f"missing files reset to default: {len(missing)}\n"
+            f"avatars {'to build' if dry_run else 'built'}: {len(unbuilt)}\n"
+            f"files {'to delete' if dry_run else 'deleted'}: {deleted} "
+            f"({freed} bytes)"
+        )
+
+
+def in_use(storage, name: str, started: datetime.datetime):
+    # The orphan list is a snapshot, so check again right before deleting:
+    # uploads made since may point at the file, or have written it before
+    # their profile was saved.
+    if storage.get_modified_time(name) >= started:
+        return True
+    if name.startswith(f"{VARIANT_DIR}/"):
+        stem = posixpath.splitext(posixpath.basename(name))[0].rsplit("-", 1)[0]
+        name = f"{AVATAR_DIR}/{stem}.png"
+    return Profile.objects.filter(avatar=name).exists()
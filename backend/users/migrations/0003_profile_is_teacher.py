@@ -0,0 +1,28 @@
+# Generated by Django 4.1.3 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_teachers(apps, schema_editor):
+    Profile = apps.get_model("users", "Profile")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Profile.objects.filter(user__in=User.objects.filter(groups__name="teacher")).update(
+        is_teacher=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0002_alter_profile_avatar"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="is_teacher",
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.RunPython(backfill_teachers, migrations.RunPython.noop),
+    ]
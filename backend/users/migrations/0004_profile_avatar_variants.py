@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_profile_is_teacher"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="avatar_variants",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -1,30 +1,111 @@
 from __future__ import annotations
 
-import os
+import hashlib
+import io
+import posixpath
 from typing import TYPE_CHECKING, cast
-from urllib.request import urlretrieve
+from urllib.request import urlopen
 
 from django.conf import settings
 from django.contrib import auth
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.db import models
+from django.templatetags.static import static
 from django.urls import reverse
 from PIL import Image
+from scheduler.cache import bump_profiles
 
 if TYPE_CHECKING:
-    from typing import Type
+    from typing import Iterable, Optional, Type
 
     from django.contrib.auth.models import AbstractUser
 
 User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
 
 
+TEACHER_GROUP = "teacher"
+AVATAR_FORMATS = {"webp": "WEBP", "png": "PNG"}
+
+
+def avatar_name(content: bytes):
+    return f"profile/{hashlib.sha256(content).hexdigest()}.png"
+
+
+def avatar_variant_name(name: str, size: int, ext: str):
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    return f"profile/variants/{stem}-{size}.{ext}"
+
+
+def avatar_variant_names(name: str):
+    return [
+        avatar_variant_name(name, size, ext)
+        for size in settings.AVATAR_SIZES
+        for ext in AVATAR_FORMATS
+    ]
+
+
+def build_avatar_variants(name: str):
+    # Variants are named after the avatar they come from, so profiles sharing
+    # an avatar share its variants and existing files are not rebuilt.
+    storage = Profile._meta.get_field("avatar").storage  # type: ignore
+    with storage.open(name, "rb") as file, Image.open(file) as img:
+        img.load()
+        for size in settings.AVATAR_SIZES:
+            variant = img.copy()
+            variant.thumbnail((size, size))
+            for ext, image_format in AVATAR_FORMATS.items():
+                variant_name = avatar_variant_name(name, size, ext)
+                if storage.exists(variant_name):
+                    continue
+                content = io.BytesIO()
+                variant.save(content, format=image_format, optimize=True)
+                storage.save(variant_name, ContentFile(content.getvalue()))
+    profiles = Profile.objects.filter(avatar=name)
+    user_ids = list(profiles.values_list("user_id", flat=True))
+    updated = profiles.update(avatar_variants=True)
+    bump_profiles(user_ids)
+    return updated
+
+
+def fetch_image(url: str):
+    with urlopen(url) as response:
+        return io.BytesIO(response.read())
+
+
+class ProfileManager(models.Manager):
+    def sync_teachers(self, user_ids: Optional[Iterable[int]] = None):
+        # Recompute the flag from group membership, for the given users or
+        # for everyone when user_ids is None.
+        if user_ids is None:
+            profiles = self.all()
+            user_ids = list(profiles.values_list("user_id", flat=True))
+        else:
+            user_ids = set(user_ids)
+            profiles = self.filter(user_id__in=user_ids)
+        updated = profiles.update(
+            is_teacher=models.Exists(
+                User.groups.through.objects.filter(
+                    user_id=models.OuterRef("user_id"), group__name=TEACHER_GROUP
+                )
+            )
+        )
+        bump_profiles(user_ids)
+        return updated
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     avatar = models.ImageField(
         upload_to="profile",
         blank=True,
     )
+    # Mirrors membership of the teacher group, kept in sync by users.signals.
+    is_teacher = models.BooleanField(default=False, db_index=True, editable=False)
+    # Set once the resized copies of the avatar exist. Profiles still without
+    # them are picked up by the build_avatar_variants worker.
+    avatar_variants = models.BooleanField(default=False, editable=False)
+
+    objects = ProfileManager()
 
     def get_absolute_url(self):
         return reverse(
@@ -45,27 +126,89 @@ class Profile(models.Model):
             else self.user.username
         )
 
-    @property
-    def avatar_url(self):
+    def avatar_url(self, size: Optional[int] = None, ext: str = "png"):
+        if not self.avatar:
+            return static(settings.DEFAULT_PROFILE)
+        if size is not None:
+            variant_url = self.avatar_variant_url(size, ext)
+            if variant_url is not None:
+                return variant_url
         return self.avatar.url  # pylint: disable=E1101
 
+    def avatar_variant_url(self, size: int, ext: str):
+        # None until the variants are built, and for the default avatar or
+        # sizes above the largest variant, which have no copy in that format.
+        if not self.avatar or not self.avatar_variants:
+            return None
+        # The smallest variant that still fills the requested size.
+        for variant_size in sorted(settings.AVATAR_SIZES):
+            if variant_size >= size:
+                return self.avatar.storage.url(  # pylint: disable=E1101
+                    avatar_variant_name(self.avatar.name, variant_size, ext)
+                )
+        return None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_avatar = dict(zip(field_names, values)).get("avatar")
+        return instance
+
+    @property
+    def avatar_changed(self):
+        return self._state.adding or self.avatar.name != getattr(
+            self, "_loaded_avatar", None
+        )
+
     def save(self, *args, **kwargs):
+        # is_teacher is only written by ProfileManager.sync_teachers and
+        # avatar_variants by build_avatar_variants, a profile loaded before
+        # either ran must not save its old value back.
+        if not self._state.adding and not args and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("is_teacher", "avatar_variants")
+            ]
+        process = self.avatar_changed
         super().save(*args, **kwargs)
-        if not self.avatar and settings.DEFAULT_PROFILE:
-            result = urlretrieve(settings.DEFAULT_PROFILE)
-            self.avatar.save(  # pylint: disable=E1101
-                "default-avatar.png", File(open(result[0], "rb"))
-            )
-        img_path = self.avatar.path  # pylint: disable=E1101
+        if process:
+            self.process_avatar()
+
+    def process_avatar(self):
+        storage = self.avatar.storage  # pylint: disable=E1101
+        previous = getattr(self, "_loaded_avatar", None) or ""
+        current = self.avatar.name or ""
         if self.user.is_superuser and settings.ADMIN_PROFILE:
-            os.remove(img_path)
-            result = urlretrieve(settings.ADMIN_PROFILE)
-            img_path = result[0]
-        img = Image.open(img_path)
-        if img.height > 250 or img.width > 250:
-            img.thumbnail((250, 250))
-        self.avatar.name = f"profile/{self.pk}-avatar.png"
-        avatar_path = self.avatar.path  # pylint: disable=E1101
-        img.save(avatar_path, bitmap_format="png")
-        if not img_path == avatar_path:
-            os.remove(img_path)
+            source = fetch_image(settings.ADMIN_PROFILE)
+        elif current:
+            source = self.avatar.path  # pylint: disable=E1101
+        elif previous:
+            source = None
+        else:
+            return
+        name = ""
+        if source is not None:
+            with Image.open(source) as img:
+                if img.height > 250 or img.width > 250:
+                    img.thumbnail((250, 250))
+                content = io.BytesIO()
+                img.save(content, format="PNG")
+            # Files are named after their content, so identical avatars are
+            # stored once and shared.
+            name = avatar_name(content.getvalue())
+            if not storage.exists(name):
+                storage.save(name, ContentFile(content.getvalue()))
+        # Write the column directly so saving the new name does not process
+        # the image a second time.
+        Profile.objects.filter(pk=self.pk).update(avatar=name, avatar_variants=False)
+        bump_profiles((self.user_id,))
+        self.avatar.name = name
+        self.avatar_variants = False
+        self._loaded_avatar = name
+        for old in {previous, current} - {"", name}:
+            if not Profile.objects.filter(avatar=old).exists():
+                storage.delete(old)
+                for variant in avatar_variant_names(old):
+                    storage.delete(variant)
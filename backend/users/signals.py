@@ -2,21 +2,49 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, cast
 
+from django.conf import settings
 from django.contrib import auth
 from django.contrib.auth.models import Group
-from django.db.models.signals import post_delete, post_save
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 from guardian.shortcuts import assign_perm
-from users.models import Profile
+from scheduler.cache import bump_profiles
+from users.models import TEACHER_GROUP, Profile
 
 if TYPE_CHECKING:
-    from typing import Type
+    from typing import Optional, Type
 
     from django.contrib.auth.models import AbstractUser
 
 User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
 
 
+@receiver(pre_save, sender=User)
+def track_promotion(
+    sender: Type[AbstractUser],
+    instance: AbstractUser,
+    update_fields: Optional[frozenset[str]] = None,
+    **kwargs,
+):  # pylint: disable=W0613
+    # Becoming a superuser is the only user change that touches the avatar.
+    # Saves that cannot change is_superuser, like the last_login update on
+    # every login, skip the lookup.
+    instance._promoted = bool(  # type: ignore
+        settings.ADMIN_PROFILE
+        and instance.is_superuser
+        and not instance._state.adding
+        and (update_fields is None or "is_superuser" in update_fields)
+        and not User.objects.filter(pk=instance.pk, is_superuser=True).exists()
+    )
+
+
 @receiver(post_save, sender=User)
 def save_profile(
     sender: Type[AbstractUser],
@@ -26,8 +54,9 @@ def save_profile(
 ):  # pylint: disable=W0613
     if created:
         Profile.objects.get_or_create(user=instance)
-    profile: Profile = instance.profile  # type: ignore
-    profile.save()
+    elif instance.__dict__.pop("_promoted", False):
+        profile: Profile = instance.profile  # type: ignore
+        profile.process_avatar()
 
 
 @receiver(post_save, sender=User)
@@ -39,7 +68,7 @@ def set_permission(
 ):  # pylint: disable=W0613
     if created:
         assign_perm("scheduler.add_session", instance)
-        teacher_group, created = Group.objects.get_or_create(name="teacher")
+        teacher_group, created = Group.objects.get_or_create(name=TEACHER_GROUP)
         assign_perm("auth.view_group", instance, teacher_group)
 
 
@@ -52,3 +81,103 @@ def delete_profile(
     if hasattr(instance, "profile"):
         profile: Profile = instance.profile
         profile.delete()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def sync_teacher_flag(
+    sender: type,
+    instance: AbstractUser | Group,
+    action: str,
+    reverse: bool,
+    pk_set: Optional[set[int]],
+    **kwargs,
+):  # pylint: disable=W0613
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            Profile.objects.sync_teachers([instance.pk])
+        return
+    if instance.name != TEACHER_GROUP:
+        return
+    if action == "pre_clear":
+        # Members are gone by post_clear, so remember who they were.
+        instance._cleared_user_ids = list(  # type: ignore
+            instance.user_set.values_list("pk", flat=True)  # type: ignore
+        )
+    elif action == "post_clear":
+        Profile.objects.sync_teachers(instance.__dict__.pop("_cleared_user_ids", []))
+    elif action in ("post_add", "post_remove"):
+        Profile.objects.sync_teachers(pk_set)
+
+
+@receiver(pre_save, sender=Group)
+def track_teacher_rename(
+    sender: Type[Group],
+    instance: Group,
+    update_fields: Optional[frozenset[str]] = None,
+    **kwargs,
+):  # pylint: disable=W0613
+    # Only a rename to or from the teacher group moves members in or out of
+    # the role; a brand new group has no members yet.
+    instance._renamed_teacher = bool(  # type: ignore
+        not instance._state.adding
+        and (update_fields is None or "name" in update_fields)
+        and Group.objects.filter(pk=instance.pk)
+        .exclude(name=instance.name)
+        .filter(Q() if instance.name == TEACHER_GROUP else Q(name=TEACHER_GROUP))
+        .exists()
+    )
+
+
+@receiver(post_save, sender=Group)
+def sync_renamed_teachers(
+    sender: Type[Group],
+    instance: Group,
+    **kwargs,
+):  # pylint: disable=W0613
+    if instance.__dict__.pop("_renamed_teacher", False):
+        Profile.objects.sync_teachers(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+def track_teacher_members(
+    sender: Type[Group],
+    instance: Group,
+    **kwargs,
+):  # pylint: disable=W0613
+    # Memberships are gone by post_delete, so remember who they were.
+    if instance.name == TEACHER_GROUP:
+        instance._deleted_user_ids = list(  # type: ignore
+            instance.user_set.values_list("pk", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Group)
+def sync_deleted_teachers(
+    sender: Type[Group],
+    instance: Group,
+    **kwargs,
+):  # pylint: disable=W0613
+    if instance.name == TEACHER_GROUP:
+        Profile.objects.sync_teachers(instance.__dict__.pop("_deleted_user_ids", []))
+
+
+@receiver(post_save, sender=User)
+def user_fragment_versions(
+    sender: Type[AbstractUser],
+    instance: AbstractUser,
+    update_fields: Optional[frozenset[str]] = None,
+    **kwargs,
+):  # pylint: disable=W0613
+    # Logging in only saves last_login, which no fragment shows.
+    if update_fields is None or update_fields - {"last_login"}:
+        bump_profiles((instance.pk,))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def profile_fragment_versions(
+    sender: Type[Profile],
+    instance: Profile,
+    **kwargs,
+):  # pylint: disable=W0613
+    bump_profiles((instance.user_id,))
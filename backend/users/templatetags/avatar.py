@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django import template
+
+if TYPE_CHECKING:
+    from users.models import Profile
+
+register = template.Library()
+
+
+@register.filter(name="avatar_url")
+def avatar_url(profile: Profile, size: int):
+    return profile.avatar_url(int(size))
+
+
+@register.filter(name="avatar_webp_url")
+def avatar_webp_url(profile: Profile, size: int):
+    # Empty when there is no WebP copy, so templates can leave out the source.
+    return profile.avatar_variant_url(int(size), "webp") or ""
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from django import template
+from users.models import TEACHER_GROUP
 
 register = template.Library()
 
@@ -10,6 +11,22 @@ if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractUser
 
 
+def group_names(user: AbstractUser):
+    # Loaded at most once per user object, that is once per request for
+    # request.user. Not joined in ProfileUserMixin.get_user like the profile:
+    # the teacher check reads the profile and no page checks other groups, so
+    # loading them with every user would add a query to every request.
+    if not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, "_group_names"):
+        user._group_names = frozenset(  # type: ignore
+            user.groups.values_list("name", flat=True)
+        )
+    return user._group_names  # type: ignore
+
+
 @register.filter(name="has_group")
 def has_group(user: AbstractUser, group_name: str):
-    return user and group_name and user.groups.filter(name=group_name).exists()
+    if user and group_name == TEACHER_GROUP and hasattr(user, "profile"):
+        return user.profile.is_teacher  # type: ignore
+    return bool(user and group_name and group_name in group_names(user))
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from django import template
+from django.template.loader import render_to_string
+from scheduler.cache import get_fragment, get_versions
 
 if TYPE_CHECKING:
     from typing import Any
@@ -12,14 +14,21 @@ if TYPE_CHECKING:
 register = template.Library()
 
 
-@register.inclusion_tag(
-    "users/profile_detail.html", name="profile_detail", takes_context=True
-)
+@register.simple_tag(name="profile_detail", takes_context=True)
 def profile_detail(
     context: dict[str, Any],
     profile: Profile,
 ):
-    return {
-        "profile": profile,
-        "user": context.get("user"),
-    }
+    user = context["request"].user
+    is_self = user.pk == profile.user_id
+    return get_fragment(
+        "profile_detail",
+        (
+            profile.user_id,
+            is_self,
+            get_versions("profile", (profile.user_id,))[profile.user_id],
+        ),
+        lambda: render_to_string(
+            "users/profile_detail.html", {"profile": profile, "is_self": is_self}
+        ),
+    )
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import io
+import tempfile
+from typing import TYPE_CHECKING, cast
+
+from django.contrib import auth
+from django.contrib.auth.models import Group
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+from users.models import TEACHER_GROUP, Profile, avatar_variant_names
+from users.templatetags.avatar import avatar_webp_url
+
+if TYPE_CHECKING:
+    from typing import Type
+
+    from django.contrib.auth.models import AbstractUser
+
+User: Type[AbstractUser] = cast("Type[AbstractUser]", auth.get_user_model())
+
+
+class TeacherGroupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("member", "member@example.com")
+        cls.group = Group.objects.create(name="staff")
+        cls.group.user_set.add(cls.user)
+
+    def is_teacher(self):
+        return Profile.objects.get(user=self.user).is_teacher
+
+    def test_rename_to_and_from_teacher(self):
+        Group.objects.filter(name=TEACHER_GROUP).delete()
+        self.group.name = TEACHER_GROUP
+        self.group.save()
+        self.assertTrue(self.is_teacher())
+        self.group.name = "staff"
+        self.group.save()
+        self.assertFalse(self.is_teacher())
+
+    def test_unrelated_edit_skips_sync(self):
+        self.group.name = "advisors"
+        with self.assertNumQueries(2):
+            self.group.save()
+
+    def test_delete_teacher_group(self):
+        teacher_group, _created = Group.objects.get_or_create(name=TEACHER_GROUP)
+        teacher_group.user_set.add(self.user)
+        self.assertTrue(self.is_teacher())
+        teacher_group.delete()
+        self.assertFalse(self.is_teacher())
+
+
+class ProfileBackendTests(TestCase):
+    def test_request_user_loads_profile(self):
+        user = User.objects.create_user("member", "member@example.com")
+        self.client.force_login(user)
+        request = RequestFactory().get("/")
+        request.session = self.client.session
+        # One query loads the session, the other the user with the profile.
+        with self.assertNumQueries(2):
+            request_user = auth.get_user(request)
+            self.assertEqual(request_user.profile.user_id, user.pk)  # type: ignore
+
+    def test_sessions_from_old_backends_stay_signed_in(self):
+        user = User.objects.create_user("member", "member@example.com")
+        for backend in (
+            "django.contrib.auth.backends.ModelBackend",
+            "allauth.account.auth_backends.AuthenticationBackend",
+        ):
+            self.client.force_login(user, backend=backend)
+            request = RequestFactory().get("/")
+            request.session = self.client.session
+            self.assertEqual(auth.get_user(request).pk, user.pk)
+
+    def test_inactive_user_is_anonymous(self):
+        user = User.objects.create_user("member", "member@example.com")
+        self.client.force_login(user)
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        request = RequestFactory().get("/")
+        request.session = self.client.session
+        self.assertFalse(auth.get_user(request).is_authenticated)
+
+
+class AvatarVariantWorkerTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_builds_variants_for_waiting_profiles(self):
+        content = io.BytesIO()
+        Image.new("RGB", (200, 200), "red").save(content, format="PNG")
+        name = default_storage.save("profile/red.png", ContentFile(content.getvalue()))
+        user = User.objects.create_user("member", "member@example.com")
+        Profile.objects.filter(user=user).update(avatar=name, avatar_variants=False)
+        call_command("build_avatar_variants", "--once", stdout=io.StringIO())
+        self.assertTrue(Profile.objects.get(user=user).avatar_variants)
+        for variant in avatar_variant_names(name):
+            self.assertTrue(default_storage.exists(variant))
+
+
+class AvatarWebpTests(TestCase):
+    def test_webp_url_only_for_built_variants(self):
+        user = User.objects.create_user("member", "member@example.com")
+        profile = Profile.objects.get(user=user)
+        self.assertEqual(avatar_webp_url(profile, 96), "")
+        profile.avatar.name = "profile/red.png"
+        self.assertEqual(avatar_webp_url(profile, 96), "")
+        profile.avatar_variants = True
+        self.assertTrue(avatar_webp_url(profile, 96).endswith("-96.webp"))
@@ -4,8 +4,7 @@ from typing import TYPE_CHECKING, cast
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import redirect, render
-from guardian.shortcuts import get_objects_for_user
+from django.shortcuts import get_object_or_404, redirect, render
 from users.forms import ProfileChangeForm
 from users.models import Profile
 
@@ -18,19 +17,20 @@ if TYPE_CHECKING:
 
 @login_required
 def profile_detail_view(request: HttpRequest, **kwargs):
-    profile = Profile.objects.get(user__username=kwargs["username"])
-    user = request.user
-    sessions = get_objects_for_user(
-        user, "scheduler.view_session", with_superuser=False
-    )
+    user = cast("AbstractUser", request.user)
+    if kwargs["username"] == user.username:
+        # ProfileUserMixin.get_user already loaded the viewer's own profile.
+        profile: Profile = user.profile  # type: ignore
+    else:
+        profile = get_object_or_404(
+            Profile.objects.select_related("user"), user__username=kwargs["username"]
+        )
     return render(
         request,
         "users/profile.html",
         context={
             "profile": profile,
             "user": user,
-            "teacher_sessions": sessions.filter(teacher=profile.user),
-            "student_sessions": sessions.filter(student=profile.user),
         },
     )
 